@@ -72,6 +72,13 @@ class MotionCaptureApp:
         (25, 26),
     ]
 
+    # Resolution fed to the pose network (landmarks are normalized, so they
+    # map straight back onto the full-resolution colour/depth frames)
+    POSE_INPUT_SIZE = (320, 240)
+
+    # Half-width (px) of the depth window searched when a joint pixel has no depth
+    DEPTH_SEARCH_RADIUS = 2
+
     def __init__(
         self,
         selected_arm: str = "auto",
@@ -121,11 +128,34 @@ class MotionCaptureApp:
         self.config = None
         self.align = None
         self.cap = None
-
-        # Data state
-        self.motion_data: list[dict] = []
+        self.depth_scale = 0.001  # z16 units → metres; replaced by the sensor's value
+
+        # Data state – frames are written into preallocated buffers
+        # (see _reset_buffers) instead of growing a list of dict rows.
+        self.joint_names: list[str] = []
+        self._ts_buf = np.empty(0, dtype=np.float64)
+        self._xyz_buf = np.empty((0, 0), dtype=np.float32)
+        self._n_frames = 0
         self.recording_start_time = 0.0
 
+    # ── Recording buffers ───────────────────────────────────────────────
+    def _reset_buffers(self):
+        """Allocate room for the whole recording (30 FPS nominal, 2× slack)."""
+        n_max = int(self.duration * 60) + 128
+        self._ts_buf = np.empty(n_max, dtype=np.float64)
+        self._xyz_buf = np.empty((n_max, 3 * len(self.joint_names)), dtype=np.float32)
+        self._n_frames = 0
+
+    def _append_frame(self, timestamp: float, coords) -> None:
+        k = self._n_frames
+        if k == len(self._ts_buf):
+            # Faster-than-expected camera: double the buffers
+            self._ts_buf = np.concatenate([self._ts_buf, np.empty_like(self._ts_buf)])
+            self._xyz_buf = np.concatenate([self._xyz_buf, np.empty_like(self._xyz_buf)])
+        self._ts_buf[k] = timestamp
+        self._xyz_buf[k] = coords
+        self._n_frames = k + 1
+
     # ── MediaPipe setup ─────────────────────────────────────────────────
     def _setup_pose_landmarker(self):
         BaseOptions = mp.tasks.BaseOptions
@@ -154,7 +184,8 @@ class MotionCaptureApp:
             self.config.enable_stream(rs.stream.depth, 640, 480, rs.format.z16, 30)
             self.config.enable_stream(rs.stream.color, 640, 480, rs.format.bgr8, 30)
             self.align = rs.align(rs.stream.color)
-            self.pipeline.start(self.config)
+            profile = self.pipeline.start(self.config)
+            self.depth_scale = profile.get_device().first_depth_sensor().get_depth_scale()
             print("✅ RealSense D435i Connected.")
             return True
         except Exception as e:
@@ -189,17 +220,27 @@ class MotionCaptureApp:
 
     # ── 3-D deprojection (RealSense only) ───────────────────────────────
     @staticmethod
-    def _deproject_to_metric(depth_frame, x, y):
-        if depth_frame is None:
+    def _deproject_to_metric(depth_np, intrinsics, depth_scale, x, y,
+                             r=DEPTH_SEARCH_RADIUS):
+        """
+        Back-project pixel (x, y) using a depth image fetched once per frame.
+
+        Falls back to the median of the valid pixels in a (2r+1)² window when
+        the joint pixel itself is a depth hole.
+        """
+        if depth_np is None:
             return None
-        w, h = depth_frame.get_width(), depth_frame.get_height()
+        h, w = depth_np.shape
         x = max(0, min(x, w - 1))
         y = max(0, min(y, h - 1))
-        dist = depth_frame.get_distance(x, y)
-        if dist <= 0:
-            return None
-        intrinsics = depth_frame.profile.as_video_stream_profile().intrinsics
-        return rs.rs2_deproject_pixel_to_point(intrinsics, [x, y], dist)
+        raw = depth_np[y, x]
+        if raw == 0:
+            win = depth_np[max(0, y - r):y + r + 1, max(0, x - r):x + r + 1]
+            valid = win[win > 0]
+            if valid.size == 0:
+                return None
+            raw = np.median(valid)
+        return rs.rs2_deproject_pixel_to_point(intrinsics, [x, y], float(raw) * depth_scale)
 
     # ── Drawing helpers ─────────────────────────────────────────────────
     def _draw_landmarks(self, image, landmarks):
@@ -248,6 +289,8 @@ class MotionCaptureApp:
             "Wrist":    self.POSE_LANDMARKS[f"{self.selected_arm.upper()}_WRIST"],
         }
         print(f"\n[Capture] Tracking arm: {self.selected_arm.upper()}")
+        self.joint_names = list(joint_indices)
+        self._reset_buffers()
 
         print("\n-------------------------------------------")
         print(" Controls:")
@@ -268,8 +311,10 @@ class MotionCaptureApp:
                 if image is None:
                     continue
 
-                # 2 – Prepare
-                image_rgb = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
+                # 2 – Prepare (downscale first so the colour conversion and
+                # the pose network both work on a quarter of the pixels)
+                small = cv2.resize(image, self.POSE_INPUT_SIZE, interpolation=cv2.INTER_AREA)
+                image_rgb = cv2.cvtColor(small, cv2.COLOR_BGR2RGB)
                 image_rgb.flags.writeable = False
                 mp_image = mp.Image(image_format=mp.ImageFormat.SRGB, data=image_rgb)
 
@@ -277,9 +322,9 @@ class MotionCaptureApp:
                 ts_ms = int(time.time() * 1000)
                 result = self.landmarker.detect_for_video(mp_image, ts_ms)
 
-                # 4 – Display
-                image_rgb.flags.writeable = True
-                image_bgr = cv2.cvtColor(image_rgb, cv2.COLOR_RGB2BGR)
+                # 4 – Display: draw on the original BGR frame; converting
+                # the RGB copy back would only reproduce it
+                image_bgr = image
 
                 # ── Gesture Detection ────────────────────────────────────
                 gesture = None
@@ -294,25 +339,24 @@ class MotionCaptureApp:
 
                     # Recording logic
                     if state == "RECORDING":
-                        row: dict = {"timestamp": time.time() - self.recording_start_time}
+                        timestamp = time.time() - self.recording_start_time
+                        coords: list[float] = []
+                        depth_np = intrinsics = None
+                        if self.camera_source == "realsense" and depth_frame is not None:
+                            depth_np = np.asanyarray(depth_frame.get_data())
+                            intrinsics = depth_frame.profile.as_video_stream_profile().intrinsics
                         for name, idx in joint_indices.items():
                             lm = landmarks[idx]
                             px, py = int(lm.x * w), int(lm.y * h)
 
                             p3d = None
                             if self.camera_source == "realsense":
-                                p3d = self._deproject_to_metric(depth_frame, px, py)
+                                p3d = self._deproject_to_metric(
+                                    depth_np, intrinsics, self.depth_scale, px, py)
 
-                            if p3d:
-                                row[f"{name}_x"] = p3d[0]
-                                row[f"{name}_y"] = p3d[1]
-                                row[f"{name}_z"] = p3d[2]
-                            else:
-                                row[f"{name}_x"] = lm.x
-                                row[f"{name}_y"] = lm.y
-                                row[f"{name}_z"] = lm.z
+                            coords.extend(p3d if p3d else (lm.x, lm.y, lm.z))
 
-                        self.motion_data.append(row)
+                        self._append_frame(timestamp, coords)
 
                         elapsed = time.time() - self.recording_start_time
                         remaining = max(0, self.duration - elapsed)
@@ -333,7 +377,7 @@ class MotionCaptureApp:
                         state = "FINISHED"
                     elif state in ["IDLE", "GRACE"]:
                         print("✌️ STOP (peace sign) detected — aborting capture session.")
-                        self.motion_data = []
+                        self._n_frames = 0
                         break
                         
                 # 6 – UI state machine
@@ -371,7 +415,7 @@ class MotionCaptureApp:
                 key = cv2.waitKey(1)
                 if key == ord("q"):
                     print("Quit requested.")
-                    self.motion_data = []
+                    self._n_frames = 0
                     break
                 if key == ord(" ") and state == "IDLE":
                     state = "GRACE"
@@ -388,7 +432,7 @@ class MotionCaptureApp:
                 self.gesture_recognizer.close()
 
         # Save
-        if self.motion_data:
+        if self._n_frames:
             return self._save_and_plot()
         else:
             print("⚠️ No data collected.")
@@ -397,7 +441,12 @@ class MotionCaptureApp:
     # ── Save to Excel & plot ────────────────────────────────────────────
     def _save_and_plot(self) -> str:
         print("\nProcessing Data...")
-        df = pd.DataFrame(self.motion_data)
+        k = self._n_frames
+        df = pd.DataFrame(
+            self._xyz_buf[:k],
+            columns=[f"{name}_{axis}" for name in self.joint_names for axis in "xyz"],
+        )
+        df.insert(0, "timestamp", self._ts_buf[:k])
 
         # ── Segment lengths (averaged to reduce jitter) ─────────────────
         per_upper = np.sqrt(
@@ -136,7 +136,7 @@ def _smooth_signal(df: pd.DataFrame,
                    cols: list,
                    window_length: int = SAVGOL_WINDOW,
                    poly_order: int = SAVGOL_POLY_ORDER) -> pd.DataFrame:
-    """Apply Savitzky-Golay filter to each target column."""
+    """Apply Savitzky-Golay filter to all target columns in one call."""
     df = df.copy()
     print(f"Stage 3: Savitzky-Golay smoothing...")
 
@@ -148,8 +148,8 @@ def _smooth_signal(df: pd.DataFrame,
     if wl <= poly_order:
         return df  # too few points to smooth
 
-    for col in cols:
-        df[col] = savgol_filter(df[col].values, wl, poly_order)
+    # One call over the (N, len(cols)) block; identical to filtering per column
+    df[cols] = savgol_filter(df[cols].to_numpy(dtype=float), wl, poly_order, axis=0)
 
     return df
 
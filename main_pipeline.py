@@ -210,6 +210,8 @@ def plot_session_attempts(slice_paths: list, output_dir: str) -> str:
     Plot all extracted attempts overlaid on one figure.
     Shows X/Y/Z per-axis traces + 3D trajectory for each attempt.
     """
+    from score import _stride
+
     n = len(slice_paths)
     colors = plt.cm.tab10(np.linspace(0, 1, max(n, 10)))
 
@@ -241,7 +243,9 @@ def plot_session_attempts(slice_paths: list, output_dir: str) -> str:
             y = df[norm_cols[1]].values
             z = df[norm_cols[2]].values
 
-            ax3d.plot(x, y, z, color=c, linewidth=1.5, label=label, alpha=0.8)
+            xyz_3d = _stride(np.column_stack([x, y, z]))
+            ax3d.plot(xyz_3d[:, 0], xyz_3d[:, 1], xyz_3d[:, 2],
+                      color=c, linewidth=1.5, label=label, alpha=0.8)
 
             for j, ax in enumerate(axes_per_axis):
                 vals = [x, y, z][j]
@@ -526,6 +530,10 @@ def plot_global_report(attempt_results: list, weights: dict,
 # ═══════════════════════════════════════════════════════════════════════════
 def main():
     global EXERCISE_TYPE, TEMPLATE_NORMALIZED_PATH, WEIGHTS_PATH, ARM, OUTPUT_DIR
+
+    # Every stage's pd.read_excel goes through calamine when it is installed
+    from score import use_fast_excel_reader
+    use_fast_excel_reader()
     
     # ── Set exercise paths based on EXERCISE_TYPE configuration ──
     TEMPLATE_NORMALIZED_PATH, WEIGHTS_PATH = get_exercise_paths(EXERCISE_TYPE)
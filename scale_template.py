@@ -17,9 +17,12 @@ Usage:
 """
 
 import os
+import stat
 import numpy as np
 import pandas as pd
 
+from score import extract_hand_data
+
 
 # ─────────────────────────────────────────────────────────────────────────────
 #  Helpers (ported from the notebook)
@@ -87,7 +90,8 @@ def _scale_template(template_df: pd.DataFrame, scalars: dict) -> pd.DataFrame:
 # ─────────────────────────────────────────────────────────────────────────────
 def scale(template_path: str,
           patient_normalized_path: str,
-          output_dir: str) -> str:
+          output_dir: str,
+          template_stat: os.stat_result | None = None) -> str:
     """
     Scale a normalized template to the patient's coordinate system.
 
@@ -99,23 +103,31 @@ def scale(template_path: str,
         Path to the patient's normalized Excel (to extract arm length & shoulder mean).
     output_dir : str
         Directory to write the output file.
+    template_stat : os.stat_result, optional
+        `os.stat(template_path)` if the caller already has it; reused for the
+        existence check and the template cache key instead of re-stat'ing.
 
     Returns
     -------
     str
         Path to the saved scaled template Excel file.
     """
-    if not os.path.isfile(template_path):
+    try:
+        template_stat = template_stat or os.stat(template_path)
+    except FileNotFoundError:
+        template_stat = None
+    if template_stat is None or not stat.S_ISREG(template_stat.st_mode):
         raise FileNotFoundError(f"Template file not found: {template_path}")
     if not os.path.isfile(patient_normalized_path):
         raise FileNotFoundError(f"Patient file not found: {patient_normalized_path}")
 
     print("Loading files...")
-    template_df = pd.read_excel(template_path)
+    # The template is static, so its wrist columns are cached as float32 .npy
+    required_cols = ['wrist_normalized_x', 'wrist_normalized_y', 'wrist_normalized_z']
+    template_df = extract_hand_data(template_path, required_cols, cache=True, stat_result=template_stat)
     patient_df  = pd.read_excel(patient_normalized_path)
 
     # ── Validate template ──────────────────────────────────────────────
-    required_cols = ['wrist_normalized_x', 'wrist_normalized_y', 'wrist_normalized_z']
     if not all(col in template_df.columns for col in required_cols):
         # Template files may be saved without headers. Try reloading with header=None
         template_df = pd.read_excel(template_path, header=None)
@@ -12,8 +12,10 @@ Specifically, it uses:
 - Shape (mDTW) scoring:
   mean-centering ONLY, then constrained mDTW path using:
     dtw_path(..., global_constraint="sakoe_chiba", sakoe_chiba_radius=radius)
+  (computed with a Numba or dtaidistance kernel when installed; same band)
 - global_rmse:
   global_rmse = sim_dist / sqrt(path_length)
+  (computed as sqrt(sum of per-axis MSE along the path), which is identical)
 - final score:
     The system now uses a hierarchical 0-10 scoring format with
     configurable weights loaded from scoring_weights.json.
@@ -39,6 +41,9 @@ Outputs (written under output_dir)
   hierarchical patient-facing score card
 - `therapist_view.png`:
   full therapist analytics dashboard
+  (the three PNGs are skipped with `save_plots=False` and left to the caller
+  with `defer_plots=True`; matplotlib is only imported the first time a plot
+  is drawn)
 
 Public API
 ----------
@@ -47,24 +52,65 @@ Public API
 - load_weights(weights_path) -> dict
 """
 
+import functools
 import json
 import io
 import warnings
 warnings.filterwarnings("ignore", category=UserWarning, module="matplotlib")
 import os
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, List, Tuple
 
 import numpy as np
 import pandas as pd
 
-import matplotlib
-
-matplotlib.use("Agg")  # headless backend for saving plots
-import matplotlib.pyplot as plt
 from scipy.fft import fft, fftfreq
 from scipy.signal import butter, filtfilt, resample
 
-from mpl_toolkits.mplot3d import Axes3D  # noqa: F401
+# ── Optional Numba import (JIT-compiled DTW kernel) ────────────────────────
+try:
+    from numba import njit
+    _HAS_NUMBA = True
+except ImportError:
+    _HAS_NUMBA = False
+
+# ── Optional python-calamine import (Rust XLSX reader for pandas) ─────────
+try:
+    import python_calamine  # noqa: F401
+    _EXCEL_ENGINE = "calamine"
+except ImportError:
+    _EXCEL_ENGINE = "openpyxl"
+
+
+def use_fast_excel_reader() -> str:
+    """
+    Make calamine pandas' default .xlsx reader for this process.
+
+    Entry points (server.py, main_pipeline.py) call this so that every plain
+    `pd.read_excel` in the normalize/segment/filter/scale stages also skips
+    openpyxl. It is a no-op without python-calamine. Returns the engine used.
+    """
+    if _EXCEL_ENGINE == "calamine":
+        pd.set_option("io.excel.xlsx.reader", "calamine")
+    return _EXCEL_ENGINE
+
+# ── Optional xlsxwriter import (faster XLSX writer than openpyxl) ─────────
+try:
+    import xlsxwriter  # noqa: F401
+    _EXCEL_WRITE_ENGINE = "xlsxwriter"
+except ImportError:
+    _EXCEL_WRITE_ENGINE = "openpyxl"
+
+# ── Optional dtaidistance import (compiled DTW with PrunedDTW) ─────────────
+try:
+    from dtaidistance import dtw as _dtai_dtw, dtw_ndim as _dtai_dtw_ndim
+    _HAS_DTAIDISTANCE = _dtai_dtw.try_import_c()
+except ImportError:
+    _HAS_DTAIDISTANCE = False
 
 
 # ═══════════════════════════════════════════════════════════════════════════
@@ -145,8 +191,14 @@ def weighted_average(scores: dict, weights: dict) -> float:
 # Notebook defaults/config
 SENSITIVITY_DEFAULT = 3.0
 DTW_RADIUS_DEFAULT = 10
+# radius=None selects an adaptive band: max(DTW_RADIUS_MIN, 5% of the longer series)
+DTW_RADIUS_MIN = 5
+DTW_RADIUS_FRACTION = 0.05
 SHAPE_TOLERANCE_M_DEFAULT = 0.20
 
+# Point budget per trajectory when returning coordinates for client-side plots
+TRAJECTORY_MAX_POINTS = 2000
+
 # SPARC notebook constants (from disected_SPARC.ipynb)
 FREQ_LIMIT_LOW = 5.0
 FREQ_LIMIT_HIGH = 20.0
@@ -178,6 +230,129 @@ def _require_columns(df: pd.DataFrame, required: List[str], name: str) -> None:
         raise ValueError(f"{name} is missing required columns: {missing}")
 
 
+def _read_columns(path: str, columns: List[str]) -> pd.DataFrame:
+    """Read the subset of `columns` present in `path`, picking the reader by extension."""
+    ext = os.path.splitext(path)[1].lower()
+    if ext == ".parquet":
+        try:
+            import pyarrow.parquet as pq
+        except ImportError as e:
+            raise ImportError(
+                f"Reading {os.path.basename(path)} requires pyarrow. "
+                "Install it (`pip install pyarrow`) or convert the file to .xlsx/.csv."
+            ) from e
+        header = pq.read_schema(path).names
+        return pd.read_parquet(path, columns=[c for c in columns if c in header])
+    wanted = set(columns)
+    if ext == ".csv":
+        return pd.read_csv(path, usecols=lambda c: c in wanted)
+    return pd.read_excel(path, engine=_EXCEL_ENGINE, usecols=lambda c: c in wanted)
+
+
+# In-process copy of cached templates: (path, mtime_ns, size, columns) -> array,
+# least recently used first. Bounded so re-saved templates (new mtime/size,
+# new key) do not accumulate for the life of the server.
+_TEMPLATE_CACHE: "OrderedDict[tuple, np.ndarray]" = OrderedDict()
+_TEMPLATE_CACHE_MAX = 8
+_TEMPLATE_CACHE_LOCK = threading.Lock()
+
+
+def _template_cache_get(key: tuple) -> np.ndarray | None:
+    with _TEMPLATE_CACHE_LOCK:
+        arr = _TEMPLATE_CACHE.get(key)
+        if arr is not None:
+            _TEMPLATE_CACHE.move_to_end(key)
+        return arr
+
+
+def _template_cache_put(key: tuple, arr: np.ndarray) -> None:
+    with _TEMPLATE_CACHE_LOCK:
+        _TEMPLATE_CACHE[key] = arr
+        _TEMPLATE_CACHE.move_to_end(key)
+        while len(_TEMPLATE_CACHE) > _TEMPLATE_CACHE_MAX:
+            _TEMPLATE_CACHE.popitem(last=False)
+
+
+def _write_atomic(target: str, write) -> None:
+    """Call `write(f)` on a unique temp file next to `target`, then rename it over `target`."""
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(target)),
+                               prefix=os.path.basename(target) + ".", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            write(f)
+        os.replace(tmp, target)
+    except BaseException:
+        try:
+            os.remove(tmp)
+        except OSError:
+            pass
+        raise
+
+# Shared pool for independent file reads (compute_score parses the patient and
+# template workbooks side by side; the parsers spend most of their time
+# outside the GIL).
+_IO_POOL = ThreadPoolExecutor(max_workers=4, thread_name_prefix="score-io")
+
+
+def extract_hand_data(
+    path: str,
+    columns: List[str],
+    cache: bool = False,
+    stat_result: os.stat_result | None = None,
+) -> pd.DataFrame:
+    """
+    Read only the requested columns of a recording or template file.
+
+    The reader is chosen from the extension (`.parquet`, `.csv`, otherwise
+    Excel) rather than by trial and error. Columns absent from the file are
+    skipped rather than raising inside pandas; callers validate with
+    `_require_columns`. Excel uses the calamine engine when python-calamine
+    is installed, otherwise openpyxl, in a single parse.
+
+    With `cache=True` (meant for static reference templates) the columns are
+    kept as float32, keyed on the file's (path, mtime, size): in a small
+    in-memory LRU (`_TEMPLATE_CACHE_MAX` entries), and on disk as a
+    `<path>.f32.npy` sidecar plus a `<path>.f32.json` key file, which a fresh
+    process memory-maps instead of parsing the source. Pass `stat_result` when the caller has already
+    stat'ed `path` to reuse it for the key.
+    """
+    if not cache:
+        return _read_columns(path, columns)
+
+    st = stat_result if stat_result is not None else os.stat(path)
+    key = (os.path.abspath(path), st.st_mtime_ns, st.st_size, tuple(columns))
+    arr = _template_cache_get(key)
+    if arr is not None:
+        return pd.DataFrame(arr, columns=columns)
+
+    cache_path = path + ".f32.npy"
+    meta_path = path + ".f32.json"
+    meta = {"mtime_ns": st.st_mtime_ns, "size": st.st_size, "columns": list(columns)}
+    try:
+        with open(meta_path, "r", encoding="utf-8") as f:
+            if json.load(f) == meta:
+                arr = np.load(cache_path, mmap_mode="r")
+    except (OSError, ValueError):
+        arr = None  # missing or unreadable sidecar: re-parse and rewrite below
+
+    if arr is None:
+        df = _read_columns(path, columns)
+        if not all(c in df.columns for c in columns):
+            return df  # let the caller report (or work around) missing columns
+        arr = df[columns].to_numpy(dtype=np.float32)
+        try:
+            for target, write in (
+                (cache_path, lambda f: np.save(f, arr)),
+                (meta_path, lambda f: f.write(json.dumps(meta).encode("utf-8"))),
+            ):
+                _write_atomic(target, write)
+        except OSError as e:
+            print(f"[WARN] Could not write template cache {cache_path}: {e}")
+
+    _template_cache_put(key, arr)
+    return pd.DataFrame(arr, columns=columns)
+
+
 def _extract_patient_global_trajectory_from_filtered(df: pd.DataFrame) -> Tuple[np.ndarray, str]:
     """
     Build patient global trajectory from the filtered file.
@@ -506,17 +681,29 @@ def calculate_rom_metrics(ref_data: np.ndarray, pat_data: np.ndarray) -> Tuple[f
       ref_range[ref_range == 0] = 1e-6
       ratios = pat_range / ref_range
       avg_rom_ratio = np.mean(ratios)
-    """
-    ref_range = np.ptp(ref_data, axis=0).astype(float)
-    pat_range = np.ptp(pat_data, axis=0).astype(float)
 
-    ref_range[ref_range == 0] = 1e-6
+    The zero guard is applied as a floor (np.maximum) and the ranges keep the
+    input dtype, so float32 trajectories are reduced without upcasting.
+    """
+    ref_range = np.maximum(np.ptp(ref_data, axis=0), 1e-6)
+    pat_range = np.ptp(pat_data, axis=0)
 
     ratios = pat_range / ref_range
     avg_rom_ratio = float(np.mean(ratios))
     return avg_rom_ratio, ratios
 
 
+# ROM grade lookup table for get_rom_grades: ratio r falls in bin
+# searchsorted(_ROM_EDGES, r, side="right"). Upper band limits are inclusive
+# (r <= 1.10 etc.), so those edges sit one ulp above the threshold.
+_ROM_EDGES = np.array([
+    0.30, 0.60, 0.80, 0.90,
+    np.nextafter(1.10, np.inf), np.nextafter(1.20, np.inf),
+    np.nextafter(1.50, np.inf), np.nextafter(1.80, np.inf),
+])
+_ROM_GRADES = np.array([0, 7, 8, 9, 10, 9, 8, 7, 0])
+
+
 def get_rom_grade(ratio: float) -> int:
     """
     Relaxed ROM thresholds (doubled tolerance bands):
@@ -531,29 +718,17 @@ def get_rom_grade(ratio: float) -> int:
         elif ratio <= 1.50: 8
         else: 7
     """
-    if ratio < 0.30 or ratio > 1.80:
-        return 0
-
-    if 0.90 <= ratio <= 1.10:
-        return 10
+    return int(get_rom_grades(np.array([ratio]))[0])
 
-    if ratio < 0.90:
-        if ratio >= 0.80:
-            return 9
-        elif ratio >= 0.60:
-            return 8
-        else:
-            return 7
-
-    if ratio > 1.10:
-        if ratio <= 1.20:
-            return 9
-        elif ratio <= 1.50:
-            return 8
-        else:
-            return 7
 
-    return 0
+def get_rom_grades(ratios: np.ndarray) -> np.ndarray:
+    """
+    Vectorized `get_rom_grade`: same bands, applied to all axes at once via
+    a binary search over the band edges. NaN ratios grade 0.
+    """
+    r = np.asarray(ratios, dtype=float)
+    grades = _ROM_GRADES[np.searchsorted(_ROM_EDGES, r, side="right")]
+    return np.where(np.isnan(r), 0, grades)
 
 
 def get_shape_grade(rmse: float, limit: float) -> int:
@@ -653,11 +828,324 @@ def build_patient_commentary(
     return msgs
 
 
+def _axis_mse_along_path(
+    template_centered: np.ndarray,
+    query_centered: np.ndarray,
+    optimal_path: np.ndarray,
+) -> np.ndarray:
+    """
+    Per-axis mean squared error between matched samples of a DTW path.
+
+    Gathers all matched pairs with one fancy-index instead of looping over
+    the path in Python. Squares are accumulated in float64 even for float32
+    inputs. Returns an array of shape (n_axes,).
+    """
+    idx = np.asarray(optimal_path, dtype=np.intp)
+    diff = template_centered[idx[:, 0]] - query_centered[idx[:, 1]]
+    return np.einsum("ij,ij->j", diff, diff, dtype=np.float64) / len(idx)
+
+
+def _mean_center(data: np.ndarray) -> np.ndarray:
+    """
+    Subtract the per-axis mean, writing straight into a float32 array.
+
+    The subtraction and the cast happen in one ufunc pass (no float64
+    intermediate), and the result is already the dtype the DTW kernel
+    consumes, so `_dtw_path` does not copy it again. The mean itself is
+    accumulated in float64. The output is forced to C order: DataFrame
+    `to_numpy()` hands back Fortran-ordered blocks, and the DTW kernel and
+    the warped-path gather both walk rows.
+    """
+    mean = data.mean(axis=0, dtype=np.float64)
+    return np.subtract(data, mean, dtype=np.float32, order="C")
+
+
+# Backtrack codes stored per cell by the Numba kernel
+_STEP_DIAG, _STEP_UP, _STEP_LEFT = 0, 1, 2
+
+if _HAS_NUMBA:
+    # No nnan/ninf flags: np.inf is the sentinel for cells outside the band
+    # or pruned by the upper bound. nogil lets concurrent requests on a
+    # threaded server align in parallel.
+    @njit(cache=True, nogil=True, fastmath={"nsz", "arcp", "contract", "afn", "reassoc"})
+    def _dtw_path_numba(a, b, radius, ub):
+        """
+        Sakoe-Chiba constrained DTW with squared-Euclidean local cost.
+
+        Fills the cost band with a two-row rolling buffer and prunes cells
+        whose partial cost exceeds `ub` (PrunedDTW). The band is widened by
+        the length difference exactly like tslearn's sakoe_chiba_mask.
+        Returns (path, cost) with path as an (L, 2) array, or an empty path
+        and np.inf when every cell of some row exceeds `ub`. Costs accumulate
+        in the dtype of `a` (float32 from `_dtw_path`).
+        """
+        n, m, n_dim = a.shape[0], b.shape[0], a.shape[1]
+
+        # Band as row-wise [band_lo, band_hi) column intervals: O(n) memory
+        # instead of an (n, m) mask.
+        rows = np.arange(n)
+        band_lo = np.maximum(0, rows - (radius + max(0, n - m)))
+        band_hi = np.minimum(m, rows + (radius + max(0, m - n)) + 1)
+
+        # prev/curr[j + 1] hold the accumulated cost of column j
+        prev = np.full(m + 1, np.inf, dtype=a.dtype)
+        curr = np.full(m + 1, np.inf, dtype=a.dtype)
+        prev[0] = 0.0
+        steps = np.zeros((n, m), dtype=np.int8)
+
+        next_start = 0          # first column the previous row kept
+        prev_last = m - 1       # last column the previous row kept
+        for i in range(n):
+            j_lo = max(next_start, band_lo[i])
+            j_hi = band_hi[i]
+            curr[j_lo] = np.inf
+            if i > 0:
+                prev[0] = np.inf
+
+            first_kept = -1
+            last_kept = -1
+            j_end = j_hi
+            for j in range(j_lo, j_hi):
+                # Seeded from axis 0 so the sum stays in the input dtype
+                diff = a[i, 0] - b[j, 0]
+                dist = diff * diff
+                for k in range(1, n_dim):
+                    diff = a[i, k] - b[j, k]
+                    dist += diff * diff
+
+                diag = prev[j]
+                up = prev[j + 1]
+                left = curr[j]
+                if diag <= up and diag <= left:
+                    best, step = diag, _STEP_DIAG
+                elif up <= left:
+                    best, step = up, _STEP_UP
+                else:
+                    best, step = left, _STEP_LEFT
+
+                cost = best + dist
+                if cost > ub:
+                    curr[j + 1] = np.inf
+                    # Past the previous row's last kept cell only the left
+                    # neighbour can feed this row, so the rest is pruned too.
+                    if j > prev_last:
+                        j_end = j + 1
+                        break
+                else:
+                    curr[j + 1] = cost
+                    steps[i, j] = step
+                    if first_kept < 0:
+                        first_kept = j
+                    last_kept = j
+
+            if first_kept < 0:
+                return np.empty((0, 2), dtype=np.intp), np.inf
+            # Cells right of j_end were not written this row and still hold
+            # costs from two rows back; clear every one the next row reads.
+            read_hi = band_hi[i + 1] if i + 1 < n else m
+            for j in range(j_end + 1, read_hi + 1):
+                curr[j] = np.inf
+
+            next_start = first_kept
+            prev_last = last_kept
+            prev, curr = curr, prev
+
+        total = prev[m]
+        if total == np.inf:
+            return np.empty((0, 2), dtype=np.intp), np.inf
+
+        # Backtrack from (n-1, m-1) to (0, 0)
+        path = np.empty((n + m - 1, 2), dtype=np.intp)
+        i, j, k = n - 1, m - 1, 0
+        while True:
+            path[k, 0] = i
+            path[k, 1] = j
+            k += 1
+            if i == 0 and j == 0:
+                break
+            step = steps[i, j]
+            if step == _STEP_DIAG:
+                i -= 1
+                j -= 1
+            elif step == _STEP_UP:
+                i -= 1
+            else:
+                j -= 1
+        return path[:k][::-1].copy(), total
+
+
+# Relative slack on the staircase bound: the kernel accumulates in float32,
+# so its cost for the optimal path can sit a few ulps above the float64 sum.
+_STAIRCASE_BOUND_SLACK = 1e-3
+
+
+def _staircase_upper_bound(a: np.ndarray, b: np.ndarray) -> float:
+    """
+    Squared cost of the straight staircase path through the (n, m) grid.
+
+    Row i sits at column round(i * (m - 1) / (n - 1)) and walks left to the
+    next row's column, so every step is diagonal, up or left and no cell
+    leaves the Sakoe-Chiba band (whose width already covers |n - m|). Being
+    the cost of one admissible path it is never below the DTW optimum, so
+    pruning the kernel against it cannot change the result.
+    """
+    n, m = len(a), len(b)
+    j_row = np.rint(np.arange(n) * ((m - 1) / max(n - 1, 1))).astype(np.intp)
+    j_end = np.maximum(j_row, np.append(j_row[1:], m) - 1)
+    counts = j_end - j_row + 1
+    rows = np.repeat(np.arange(n), counts)
+    cols = np.repeat(j_row - (np.cumsum(counts) - counts), counts) + np.arange(counts.sum())
+    diff = a[rows].astype(np.float64) - b[cols]
+    return float(np.einsum("ij,ij->", diff, diff))
+
+
+def _effective_radius(radius: int | None, n: int, m: int, window: float | None = None) -> int:
+    """
+    Sakoe-Chiba radius to use.
+
+    `window` (fraction of the longer series) takes precedence over `radius`;
+    `radius=None` scales the band with the longer series.
+    """
+    if window is not None:
+        window = float(window)
+        if not (np.isfinite(window) and 0 < window <= 1):
+            raise ValueError(f"window must be a finite fraction in (0, 1], got {window}")
+        return max(1, int(window * max(n, m)))
+    if radius is None:
+        return max(DTW_RADIUS_MIN, int(DTW_RADIUS_FRACTION * max(n, m)))
+    return int(radius)
+
+
+def _abandon_cost(abandon_threshold: float | None, n: int, m: int) -> float:
+    """
+    Accumulated squared cost above which global RMSE must exceed the threshold.
+
+    global_rmse = sqrt(cost / L) with L <= n + m - 1, so any partial path
+    costing more than threshold^2 * (n + m - 1) can be abandoned safely.
+    """
+    if abandon_threshold is None:
+        return np.inf
+    abandon_threshold = float(abandon_threshold)
+    if not (np.isfinite(abandon_threshold) and abandon_threshold > 0):
+        raise ValueError(f"abandon_threshold must be a finite number > 0, got {abandon_threshold}")
+    return abandon_threshold ** 2 * (n + m - 1)
+
+
+def _dtw_path(
+    template_centered: np.ndarray,
+    query_centered: np.ndarray,
+    radius: int,
+    abandon_cost: float = np.inf,
+) -> np.ndarray:
+    """
+    Sakoe-Chiba constrained mDTW warping path as an (L, 2) index array.
+
+    Returns an empty (0, 2) array when every path costs more than
+    `abandon_cost` (see `_abandon_cost`); the Numba kernel stops filling the
+    band as soon as that is certain.
+
+    Uses the Numba kernel above when Numba is installed, then dtaidistance's
+    C kernel, then tslearn's `dtw_path(..., global_constraint="sakoe_chiba")`.
+    All use a squared-Euclidean local cost over the same band, so the path
+    is identical (the float32 Numba kernel can only differ on near-ties,
+    whose RMSE differs by float32 rounding). RMSE along the returned path is
+    accumulated in float64.
+    The Numba kernel also prunes against `_staircase_upper_bound`, which
+    never lies below the optimum, so the path is unchanged.
+    """
+    if _HAS_NUMBA:
+        # float32 halves the bytes streamed per cell; positions are metres
+        # and paths are ~10^3 long, well within float32 resolution. Both are
+        # no-ops for `_mean_center` output.
+        a = np.ascontiguousarray(template_centered, dtype=np.float32)
+        b = np.ascontiguousarray(query_centered, dtype=np.float32)
+        # Pruning with any bound at or above the optimum leaves the path
+        # unchanged, so the staircase bound never needs a re-run.
+        ub = _staircase_upper_bound(a, b) * (1.0 + _STAIRCASE_BOUND_SLACK)
+        optimal_path, _ = _dtw_path_numba(a, b, int(radius), min(ub, abandon_cost))
+        return optimal_path
+
+    if _HAS_DTAIDISTANCE:
+        # dtaidistance's window w allows |i - j| < w; tslearn's radius r allows <= r
+        optimal_path = _dtai_dtw_ndim.warping_path(
+            np.ascontiguousarray(template_centered, dtype=np.double),
+            np.ascontiguousarray(query_centered, dtype=np.double),
+            window=radius + 1,
+            use_c=True,
+            use_pruning=True,
+        )
+        return _abandon_if_over(template_centered, query_centered, optimal_path, abandon_cost)
+
+    try:
+        from tslearn.metrics import dtw_path
+    except ImportError as e:
+        raise ImportError(
+            "dtaidistance or tslearn is required to exactly match Scoring_Module/disected_mmDTW.ipynb. "
+            "Install one (e.g. `pip install dtaidistance`) and re-run."
+        ) from e
+
+    optimal_path, _ = dtw_path(
+        template_centered,
+        query_centered,
+        global_constraint="sakoe_chiba",
+        sakoe_chiba_radius=radius,
+    )
+    return _abandon_if_over(template_centered, query_centered, optimal_path, abandon_cost)
+
+
+def _abandon_if_over(template_centered, query_centered, optimal_path, abandon_cost) -> np.ndarray:
+    """Apply `abandon_cost` after the fact for the fallback kernels."""
+    optimal_path = np.asarray(optimal_path, dtype=np.intp)
+    if np.isfinite(abandon_cost):
+        cost = _axis_mse_along_path(template_centered, query_centered, optimal_path).sum() * len(optimal_path)
+        if cost > abandon_cost:
+            return np.empty((0, 2), dtype=np.intp)
+    return optimal_path
+
+
+def _rmse_along_path(
+    template_centered: np.ndarray,
+    query_centered: np.ndarray,
+    optimal_path: np.ndarray,
+    abandon_threshold: float | None = None,
+) -> Tuple[float, Tuple[float, float, float], bool]:
+    """
+    (global_rmse, (rmse_x, rmse_y, rmse_z), abandoned) for a `_dtw_path` result.
+
+    An abandoned alignment (empty path) reports an infinite global RMSE and
+    NaN per-axis RMSE, so it grades and scores as the worst possible shape
+    match; the true RMSE is only known to exceed `abandon_threshold`.
+    """
+    if len(optimal_path) == 0:
+        return np.inf, (np.nan, np.nan, np.nan), True
+    # sum(axis_mse) * path_length == sim_dist**2, so global_rmse is
+    # identical to sim_dist / sqrt(path_length).
+    axis_mse = _axis_mse_along_path(template_centered, query_centered, optimal_path)
+    return float(np.sqrt(axis_mse.sum())), tuple(np.sqrt(axis_mse).tolist()), False
+
+
+def warmup_dtw() -> float:
+    """
+    Compile (or load from Numba's on-disk cache) the DTW kernel for the
+    float32 signature `_dtw_path` uses, so the first scored request does not
+    pay the JIT cost. Returns the seconds spent; 0.0 without Numba.
+    """
+    if not _HAS_NUMBA:
+        return 0.0
+    t0 = time.perf_counter()
+    t = np.linspace(0.0, 1.0, 32, dtype=np.float32)
+    dummy = np.column_stack([t, t ** 2, t ** 3])
+    _dtw_path(dummy, dummy[::-1].copy(), DTW_RADIUS_DEFAULT)
+    return time.perf_counter() - t0
+
+
 def calculate_mdtw_with_sensitivity(
     template: np.ndarray,
     query: np.ndarray,
     sensitivity: float = SENSITIVITY_DEFAULT,
-    radius: int = DTW_RADIUS_DEFAULT,
+    radius: int | None = DTW_RADIUS_DEFAULT,
+    window: float | None = None,
+    abandon_threshold: float | None = None,
 ) -> Tuple[
     float,  # final_score
     float,  # global_rmse
@@ -672,41 +1160,28 @@ def calculate_mdtw_with_sensitivity(
     3) Calculate Global RMSE
     4) Calculate Per-Axis RMSE along warped path
     5) Final score: 10.0 * exp(-sensitivity * global_rmse)
-    """
-    try:
-        from tslearn.metrics import dtw_path
-    except ImportError as e:
-        raise ImportError(
-            "tslearn is required to exactly match Scoring_Module/disected_mmDTW.ipynb. "
-            "Install it (e.g. `pip install tslearn`) and re-run."
-        ) from e
 
+    `radius=None` uses an adaptive band and `window` overrides it as a
+    fraction of the longer series (see `_effective_radius`). With
+    `abandon_threshold` (global RMSE, m) the alignment is abandoned once the
+    RMSE is certain to exceed it; the global RMSE is then infinite and the
+    final score 0.0 (see `_rmse_along_path`).
+    """
     # 1. Mean-Centering ONLY
-    template_centered = template - np.mean(template, axis=0)
-    query_centered = query - np.mean(query, axis=0)
-
-    # 2. Compute mDTW path (exact call signature)
-    optimal_path, sim_dist = dtw_path(
-        template_centered,
-        query_centered,
-        global_constraint="sakoe_chiba",
-        sakoe_chiba_radius=radius,
+    template_centered = _mean_center(template)
+    query_centered = _mean_center(query)
+
+    # 2. Compute mDTW path (Sakoe-Chiba band, same as the notebook)
+    n, m = len(template_centered), len(query_centered)
+    radius = _effective_radius(radius, n, m, window)
+    optimal_path = _dtw_path(
+        template_centered, query_centered, radius, _abandon_cost(abandon_threshold, n, m)
     )
 
-    # 3. Calculate Global RMSE (3D)
-    path_length = len(optimal_path)
-    global_rmse = sim_dist / np.sqrt(path_length)
-
-    # 4. Calculate Per-Axis RMSE along warped path
-    sq_err_x, sq_err_y, sq_err_z = 0.0, 0.0, 0.0
-    for (i, j) in optimal_path:
-        sq_err_x += (template_centered[i, 0] - query_centered[j, 0]) ** 2
-        sq_err_y += (template_centered[i, 1] - query_centered[j, 1]) ** 2
-        sq_err_z += (template_centered[i, 2] - query_centered[j, 2]) ** 2
-
-    rmse_x = np.sqrt(sq_err_x / path_length)
-    rmse_y = np.sqrt(sq_err_y / path_length)
-    rmse_z = np.sqrt(sq_err_z / path_length)
+    # 3./4. Per-axis and global RMSE along warped path.
+    global_rmse, (rmse_x, rmse_y, rmse_z), _ = _rmse_along_path(
+        template_centered, query_centered, optimal_path, abandon_threshold
+    )
 
     # 5. Final Score (Patient Gamification View - Exponential Decay)
     final_score = 10.0 * np.exp(-sensitivity * global_rmse)
@@ -719,6 +1194,13 @@ def calculate_mdtw_with_sensitivity(
     )
 
 
+def _format_rmse(global_rmse: float, abandon_threshold: float | None = None) -> str:
+    """Global RMSE for report text; abandoned alignments show the threshold."""
+    if np.isfinite(global_rmse):
+        return f"{global_rmse:.3f} m"
+    return f"> {abandon_threshold:.3f} m (DTW abandoned)"
+
+
 def generate_therapist_report(
     rom_ratio: float,
     avg_rom_grade: int,
@@ -728,9 +1210,13 @@ def generate_therapist_report(
     shape_grade: int,
     axis_rmse: Tuple[float, float, float],
     shape_limit: float,
+    abandon_threshold: float | None = None,
 ) -> str:
     """
     Notebook report text formatting logic (verbatim).
+
+    An abandoned DTW alignment (infinite `global_rmse`) is reported as
+    exceeding `abandon_threshold`, without a per-axis breakdown.
     """
     report = []
 
@@ -760,9 +1246,13 @@ def generate_therapist_report(
     # 2. Shape Analysis
     report.append(f"\nSHAPE QUALITY (RMSE)")
     report.append(f"  > Grade:        {shape_grade} / 10")
-    report.append(f"  > Global Error: {global_rmse:.3f} m")
+    report.append(f"  > Global Error: {_format_rmse(global_rmse, abandon_threshold)}")
     report.append(f"  > Limit:        < {shape_limit:.3f} m")
 
+    if not np.isfinite(global_rmse):
+        report.append("  > STATUS: INCORRECT SHAPE (DTW alignment abandoned)")
+        return "\n".join(report)
+
     rmse_x, rmse_y, rmse_z = axis_rmse
     max_err = max(rmse_x, rmse_y, rmse_z)
 
@@ -785,6 +1275,37 @@ def generate_therapist_report(
     return "\n".join(report)
 
 
+def _stride(data: np.ndarray, max_points: int = TRAJECTORY_MAX_POINTS) -> np.ndarray:
+    """
+    Every k-th row of `data`, with k chosen so at most `max_points` remain.
+
+    Used for JSON trajectories and before Axes3D.plot, whose draw cost grows
+    with the segment count; the 2-D per-axis plots keep every sample.
+    """
+    return data[::max(1, -(-len(data) // max_points))]
+
+
+def _trajectory_payload(data: np.ndarray) -> List[List[float]]:
+    """Strided trajectory as nested lists, rounded to 10 um, for JSON responses."""
+    return np.round(_stride(data).astype(np.float64), 5).tolist()
+
+
+def _agg_figure(figsize: Tuple[float, float], dpi: int = 150):
+    """
+    A Figure on its own Agg canvas, imported on first use.
+
+    Bypasses pyplot entirely: no global figure manager to register with or
+    close, so renders from concurrent request threads do not share state.
+    """
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from matplotlib.figure import Figure
+    from mpl_toolkits.mplot3d import Axes3D  # noqa: F401  (registers "3d")
+
+    fig = Figure(figsize=figsize, dpi=dpi)
+    FigureCanvasAgg(fig)
+    return fig
+
+
 def plot_comparison(
     ref_data: np.ndarray,
     pat_data: np.ndarray,
@@ -796,12 +1317,13 @@ def plot_comparison(
     """
     Notebook-style plot logic with a saved output.
     """
-    fig = plt.figure(figsize=(15, 8))
+    fig = _agg_figure(figsize=(15, 8))
 
     # Plot 1: 3D Trajectory
     ax1 = fig.add_subplot(1, 2, 1, projection="3d")
-    ax1.plot(ref_data[:, 0], ref_data[:, 1], ref_data[:, 2], "k--", label="Expert Ref (Centered)")
-    ax1.plot(pat_data[:, 0], pat_data[:, 1], pat_data[:, 2], "r", linewidth=2, label="Patient (Centered)")
+    ref_3d, pat_3d = _stride(ref_data), _stride(pat_data)
+    ax1.plot(ref_3d[:, 0], ref_3d[:, 1], ref_3d[:, 2], "k--", label="Expert Ref (Centered)")
+    ax1.plot(pat_3d[:, 0], pat_3d[:, 1], pat_3d[:, 2], "r", linewidth=2, label="Patient (Centered)")
     ax1.set_title(f"Patient Performance: {score}/10", fontsize=16, fontweight="bold", color="blue")
     ax1.legend()
     ax1.set_xlabel("X")
@@ -833,10 +1355,9 @@ def plot_comparison(
     ax_z.set_title("Z-Axis (Centered)")
     ax_z.axis("off")
 
-    plt.tight_layout()
+    fig.tight_layout()
     plot_path = os.path.join(output_dir, "score_plot.png")
-    fig.savefig(plot_path, dpi=150)
-    plt.close(fig)
+    fig.canvas.print_png(plot_path)
     return plot_path
 
 
@@ -845,15 +1366,15 @@ def plot_filtered_output(ref_data_global: np.ndarray, pat_data_filtered_global:
     Score plot: 3D trajectory overlay + per-axis comparison
     of the filtered patient signal vs the scaled reference template.
     """
-    fig = plt.figure(figsize=(16, 10))
+    fig = _agg_figure(figsize=(16, 10))
     gs = fig.add_gridspec(3, 2, width_ratios=[1, 1.2], hspace=0.35, wspace=0.30)
 
     # ── Left: 3D trajectory overlay ────────────────────────────────────
     ax3d = fig.add_subplot(gs[:, 0], projection="3d")
-    ax3d.plot(ref_data_global[:, 0], ref_data_global[:, 1], ref_data_global[:, 2],
+    ref_3d, pat_3d = _stride(ref_data_global), _stride(pat_data_filtered_global)
+    ax3d.plot(ref_3d[:, 0], ref_3d[:, 1], ref_3d[:, 2],
               "k--", linewidth=1.5, label="Reference Template")
-    ax3d.plot(pat_data_filtered_global[:, 0], pat_data_filtered_global[:, 1],
-              pat_data_filtered_global[:, 2],
+    ax3d.plot(pat_3d[:, 0], pat_3d[:, 1], pat_3d[:, 2],
               "r", linewidth=1.5, label="Patient (Filtered)")
     ax3d.set_title("3D Trajectory Overlay", fontsize=12, fontweight="bold")
     ax3d.set_xlabel("X")
@@ -877,10 +1398,9 @@ def plot_filtered_output(ref_data_global: np.ndarray, pat_data_filtered_global:
 
     fig.suptitle("Score Plot: Filtered Signal vs Reference Template",
                  fontsize=14, fontweight="bold", y=0.98)
-    plt.tight_layout(rect=[0, 0, 1, 0.96])
+    fig.tight_layout(rect=[0, 0, 1, 0.96])
     out_path = os.path.join(output_dir, "score_plot.png")
-    fig.savefig(out_path, dpi=150)
-    plt.close(fig)
+    fig.canvas.print_png(out_path)
     return out_path
 
 
@@ -892,7 +1412,7 @@ def plot_patient_view(
     commentary: list, output_dir: str,
 ) -> str:
     """Patient-facing score report: hierarchical scores + feedback."""
-    fig = plt.figure(figsize=(12, 10))
+    fig = _agg_figure(figsize=(12, 10))
     gs = fig.add_gridspec(3, 2, hspace=0.45, wspace=0.35,
                           height_ratios=[1, 1.5, 1.2])
 
@@ -937,10 +1457,10 @@ def plot_patient_view(
     ax_fb.text(0.05, 0.75, feedback_text, fontsize=11, va="top",
                family="sans-serif", linespacing=1.8)
 
-    plt.tight_layout()
+    fig.tight_layout()
     path = os.path.join(output_dir, "patient_view.png")
-    fig.savefig(path, dpi=150, bbox_inches="tight")
-    plt.close(fig)
+    # bbox_inches="tight" needs savefig; it still renders on the Agg canvas
+    fig.savefig(path, bbox_inches="tight")
     return path
 
 
@@ -955,14 +1475,15 @@ def plot_therapist_view(
     raw_metrics_text: str, output_dir: str,
 ) -> str:
     """Therapist-facing analytics report: plots + raw data + scores."""
-    fig = plt.figure(figsize=(20, 16))
+    fig = _agg_figure(figsize=(20, 16))
     gs = fig.add_gridspec(3, 6, hspace=0.40, wspace=0.45)
 
     # ── Row 0 left: 3D trajectory (3 cols) ─────────────────────────
     ax3d = fig.add_subplot(gs[0, :3], projection="3d")
-    ax3d.plot(template_centered[:, 0], template_centered[:, 1], template_centered[:, 2],
+    ref_3d, pat_3d = _stride(template_centered), _stride(query_centered)
+    ax3d.plot(ref_3d[:, 0], ref_3d[:, 1], ref_3d[:, 2],
               "k--", label="Reference (Centered)")
-    ax3d.plot(query_centered[:, 0], query_centered[:, 1], query_centered[:, 2],
+    ax3d.plot(pat_3d[:, 0], pat_3d[:, 1], pat_3d[:, 2],
               "r", linewidth=2, label="Patient (Centered)")
     ax3d.set_title(f"3D Trajectory  |  Global: {global_score}/10",
                    fontsize=13, fontweight="bold", color="blue")
@@ -1024,10 +1545,10 @@ def plot_therapist_view(
         ax_bar.text(sc + 0.15, yp, f"{sc:.1f}" if isinstance(sc, float) else f"{sc}",
                     va="center", fontsize=9, fontweight="bold")
 
-    plt.tight_layout()
+    fig.tight_layout()
     path = os.path.join(output_dir, "therapist_view.png")
-    fig.savefig(path, dpi=150, bbox_inches="tight")
-    plt.close(fig)
+    # bbox_inches="tight" needs savefig; it still renders on the Agg canvas
+    fig.savefig(path, bbox_inches="tight")
     return path
 
 
@@ -1036,7 +1557,9 @@ def compute_score(
     scaled_template_path: str,
     output_dir: str,
     sensitivity: float = SENSITIVITY_DEFAULT,
-    radius: int = DTW_RADIUS_DEFAULT,
+    radius: int | None = DTW_RADIUS_DEFAULT,
+    window: float | None = None,
+    abandon_threshold: float | None = None,
     shape_limit_m: float = SHAPE_TOLERANCE_M_DEFAULT,
     sparc_sample_rate: float = SAMPLE_RATE_DEFAULT,
     sparc_filter_freq: float = FILTER_FREQ_DEFAULT,
@@ -1045,6 +1568,9 @@ def compute_score(
     jerk_iqr_multiplier: float = JERK_IQR_MULTIPLIER_DEFAULT,
     velocity_buffer_pct: float = VELOCITY_BUFFER_PCT_DEFAULT,
     weights: dict | None = None,
+    save_plots: bool = True,
+    return_trajectories: bool = False,
+    defer_plots: bool = False,
 ) -> Dict:
     """
     Computes the notebook-aligned score and writes outputs.
@@ -1053,6 +1579,29 @@ def compute_score(
     ----------
     weights : dict | None
         Scoring weights dict. If None, loads from scoring_weights.json.
+    radius : int | None
+        Sakoe-Chiba radius. None adapts it to the trajectory length; the
+        radius actually used is written to the `dtw_radius` column.
+    window : float | None
+        Sakoe-Chiba band as a fraction of the longer trajectory; overrides
+        `radius` when given.
+    abandon_threshold : float | None
+        Global RMSE (m) beyond which the DTW alignment is abandoned early.
+        An abandoned attempt grades as shape 0 (scored as if the RMSE were
+        infinite) and reports `dtw_abandoned`, no global or per-axis RMSE
+        and an empty `dtw_alignment` sheet.
+    save_plots : bool
+        Render score_plot/patient_view/therapist_view PNGs. When False the
+        corresponding `saved` paths are None and matplotlib is never imported.
+    return_trajectories : bool
+        Add a `trajectories` entry with the mean-centred template and patient
+        paths (strided to TRAJECTORY_MAX_POINTS) so a client can draw them
+        without the PNGs.
+    defer_plots : bool
+        With `save_plots`, skip rendering and return the three plot calls
+        under `plot_renderers` instead ({"score_plot_png": ..., ...}, each
+        called as `render(output_dir=...)` and returning the PNG path); the
+        `saved` plot paths are then None.
     """
     if not os.path.isfile(patient_filtered_path):
         raise FileNotFoundError(f"Patient file not found: {patient_filtered_path}")
@@ -1065,13 +1614,21 @@ def compute_score(
     if weights is None:
         weights = load_weights()
 
+    # The two reads are independent; run them concurrently.
+    pat_future = _IO_POOL.submit(
+        extract_hand_data,
+        patient_filtered_path,
+        PATIENT_FILTERED_NORMALIZED_COLS + PATIENT_SHOULDER_COLS + ["total_arm_length"] + PATIENT_COLS,
+    )
+    ref_future = _IO_POOL.submit(extract_hand_data, scaled_template_path, TEMPLATE_COLS)
+
     try:
-        pat_df = pd.read_excel(patient_filtered_path)
+        pat_df = pat_future.result()
     except Exception as e:
         raise RuntimeError(f"Failed to read patient Excel: {patient_filtered_path}. Error: {e}") from e
 
     try:
-        ref_df = pd.read_excel(scaled_template_path)
+        ref_df = ref_future.result()
     except Exception as e:
         raise RuntimeError(f"Failed to read template Excel: {scaled_template_path}. Error: {e}") from e
 
@@ -1088,40 +1645,23 @@ def compute_score(
     rom_ratio, rom_ratios = calculate_rom_metrics(ref_data, pat_data)
 
     # 2) Per-axis grades + global avg grade (rounded)
-    rom_axis_grades = [get_rom_grade(float(r)) for r in rom_ratios]
-    avg_rom_grade = int(round(np.mean(rom_axis_grades)))
+    rom_grade_arr = get_rom_grades(rom_ratios)
+    rom_axis_grades = rom_grade_arr.tolist()
+    avg_rom_grade = int(round(rom_grade_arr.mean()))
 
     # 3) mDTW scoring
-    try:
-        from tslearn.metrics import dtw_path
-    except ImportError as e:
-        raise ImportError(
-            "tslearn is required to exactly match Scoring_Module/disected_mmDTW.ipynb. "
-            "Install it (e.g. `pip install tslearn`) and re-run."
-        ) from e
-
-    template_centered = ref_data - np.mean(ref_data, axis=0)
-    query_centered = pat_data - np.mean(pat_data, axis=0)
-    optimal_path, sim_dist = dtw_path(
-        template_centered,
-        query_centered,
-        global_constraint="sakoe_chiba",
-        sakoe_chiba_radius=radius,
+    template_centered = _mean_center(ref_data)
+    query_centered = _mean_center(pat_data)
+    n, m = len(template_centered), len(query_centered)
+    radius = _effective_radius(radius, n, m, window)
+    optimal_path = _dtw_path(
+        template_centered, query_centered, radius, _abandon_cost(abandon_threshold, n, m)
     )
-
-    path_length = len(optimal_path)
-    global_rmse = sim_dist / np.sqrt(path_length)
-
-    sq_err_x, sq_err_y, sq_err_z = 0.0, 0.0, 0.0
-    for (i, j) in optimal_path:
-        sq_err_x += (template_centered[i, 0] - query_centered[j, 0]) ** 2
-        sq_err_y += (template_centered[i, 1] - query_centered[j, 1]) ** 2
-        sq_err_z += (template_centered[i, 2] - query_centered[j, 2]) ** 2
-
-    rmse_x = np.sqrt(sq_err_x / path_length)
-    rmse_y = np.sqrt(sq_err_y / path_length)
-    rmse_z = np.sqrt(sq_err_z / path_length)
-    axis_rmse = (float(rmse_x), float(rmse_y), float(rmse_z))
+    global_rmse, axis_rmse, dtw_abandoned = _rmse_along_path(
+        template_centered, query_centered, optimal_path, abandon_threshold
+    )
+    if dtw_abandoned:
+        print(f"[INFO] DTW abandoned: global RMSE exceeds {abandon_threshold:.3f} m")
 
     # 4) Shape grade
     shape_grade = get_shape_grade(global_rmse, shape_limit_m)
@@ -1136,6 +1676,7 @@ def compute_score(
         shape_grade=shape_grade,
         axis_rmse=axis_rmse,
         shape_limit=shape_limit_m,
+        abandon_threshold=abandon_threshold,
     )
 
     # 5b) SPARC analysis (exact logic from disected_SPARC.ipynb)
@@ -1223,7 +1764,7 @@ def compute_score(
         f"{'='*40}\n"
         f"Global Score:          {global_score_10} / 10\n"
         f"DTW Score:             {dtw_score} / 10\n"
-        f"  Shape (SoM):         {som_grade} / 10  [RMSE: {global_rmse:.3f}m]\n"
+        f"  Shape (SoM):         {som_grade} / 10  [RMSE: {_format_rmse(global_rmse, abandon_threshold)}]\n"
         f"  Range (ROM):         {rom_grade_val} / 10  [Ratio: {rom_ratio*100:.1f}%]\n"
         f"Tempo & Control:       {tempo_control_g} / 10  [RMSE: {sparc_pat['Velocity_RMSE']:.3f}]\n"
         f"Hesitation:            {hesit_g} / 10  [dLow: {abs(sparc_pat['Low_Band_SPARC']-sparc_ref['Low_Band_SPARC']):.3f}]\n"
@@ -1240,34 +1781,52 @@ def compute_score(
         f"{'Vel RMSE':<20} {'--':>10} {sparc_pat['Velocity_RMSE']:>10.4f}\n"
         f"\n"
         f"ROM: {rom_ratio*100:.1f}% (X:{rom_ratios[0]*100:.0f}% Y:{rom_ratios[1]*100:.0f}% Z:{rom_ratios[2]*100:.0f}%)\n"
-        f"Shape RMSE: {global_rmse:.3f}m  (X:{axis_rmse[0]:.3f} Y:{axis_rmse[1]:.3f} Z:{axis_rmse[2]:.3f})"
-    )
-
-    # 8) Save plots
-    filtered_plot_path = plot_filtered_output(
-        ref_data_global=ref_data,
-        pat_data_filtered_global=pat_data,
-        output_dir=output_dir,
-    )
-    patient_view_path = plot_patient_view(
-        global_score=global_score_10, dtw_score=dtw_score,
-        som_grade=som_grade, rom_grade=rom_grade_val,
-        tempo_control_grade=tempo_control_g,
-        hesitation_grade=hesit_g, tremor_grade=tremor_g,
-        commentary=commentary, output_dir=output_dir,
-    )
-    therapist_view_path = plot_therapist_view(
-        template_centered=template_centered, query_centered=query_centered,
-        ref_data_global=ref_data, pat_data_global=pat_data,
-        ref_speed=plot_data["Ref_Speed"], pat_speed=plot_data["Pat_Speed"],
-        global_score=global_score_10, dtw_score=dtw_score,
-        som_grade=som_grade, rom_grade=rom_grade_val,
-        tempo_control_grade=tempo_control_g,
-        hesitation_grade=hesit_g, tremor_grade=tremor_g,
-        raw_metrics_text=raw_metrics_text, output_dir=output_dir,
+        + (
+            f"Shape RMSE: {global_rmse:.3f}m  (X:{axis_rmse[0]:.3f} Y:{axis_rmse[1]:.3f} Z:{axis_rmse[2]:.3f})"
+            if not dtw_abandoned
+            else f"Shape RMSE: {_format_rmse(global_rmse, abandon_threshold)}"
+        )
     )
 
-    # 9) Save raw_scores.xlsx (raw metric values only)
+    # 8) Save plots (or, with defer_plots, hand the calls back unrendered)
+    filtered_plot_path = patient_view_path = therapist_view_path = None
+    plot_renderers = None
+    if save_plots:
+        plot_renderers = {
+            "score_plot_png": functools.partial(
+                plot_filtered_output,
+                ref_data_global=ref_data,
+                pat_data_filtered_global=pat_data,
+            ),
+            "patient_view_png": functools.partial(
+                plot_patient_view,
+                global_score=global_score_10, dtw_score=dtw_score,
+                som_grade=som_grade, rom_grade=rom_grade_val,
+                tempo_control_grade=tempo_control_g,
+                hesitation_grade=hesit_g, tremor_grade=tremor_g,
+                commentary=commentary,
+            ),
+            "therapist_view_png": functools.partial(
+                plot_therapist_view,
+                template_centered=template_centered, query_centered=query_centered,
+                ref_data_global=ref_data, pat_data_global=pat_data,
+                ref_speed=plot_data["Ref_Speed"], pat_speed=plot_data["Pat_Speed"],
+                global_score=global_score_10, dtw_score=dtw_score,
+                som_grade=som_grade, rom_grade=rom_grade_val,
+                tempo_control_grade=tempo_control_g,
+                hesitation_grade=hesit_g, tremor_grade=tremor_g,
+                raw_metrics_text=raw_metrics_text,
+            ),
+        }
+        if not defer_plots:
+            filtered_plot_path = plot_renderers["score_plot_png"](output_dir=output_dir)
+            patient_view_path = plot_renderers["patient_view_png"](output_dir=output_dir)
+            therapist_view_path = plot_renderers["therapist_view_png"](output_dir=output_dir)
+
+    # 9) Save raw_scores.xlsx (raw metric values only). An abandoned
+    # alignment's RMSE is unknown (only > threshold): written as an empty
+    # cell, with `dtw_abandoned` in the scores sheet saying why.
+    reported_rmse = None if dtw_abandoned else global_rmse
     raw_scores_df = pd.DataFrame({
         "ref_total_sparc": [sparc_ref["Total_SPARC"]],
         "pat_total_sparc": [sparc_pat["Total_SPARC"]],
@@ -1288,18 +1847,18 @@ def compute_score(
         "rom_ratio_x": [rom_ratios[0]],
         "rom_ratio_y": [rom_ratios[1]],
         "rom_ratio_z": [rom_ratios[2]],
-        "global_rmse": [global_rmse],
+        "global_rmse": [reported_rmse],
         "rmse_x": [axis_rmse[0]],
         "rmse_y": [axis_rmse[1]],
         "rmse_z": [axis_rmse[2]],
     })
     raw_scores_path = os.path.join(output_dir, "raw_scores.xlsx")
-    raw_scores_df.to_excel(raw_scores_path, index=False, engine="openpyxl")
+    raw_scores_df.to_excel(raw_scores_path, index=False, engine=_EXCEL_WRITE_ENGINE)
 
     # 10) Save score_results.xlsx (hierarchical grades + raw + config)
     alignment_df = pd.DataFrame({
-        "template_index": [i for (i, _) in optimal_path],
-        "query_index": [j for (_, j) in optimal_path],
+        "template_index": optimal_path[:, 0],
+        "query_index": optimal_path[:, 1],
     })
 
     scores_df = pd.DataFrame({
@@ -1310,7 +1869,7 @@ def compute_score(
         "tempo_control_grade": [tempo_control_g],
         "hesitation_grade": [hesit_g],
         "tremor_grade": [tremor_g],
-        "global_rmse": [global_rmse],
+        "global_rmse": [reported_rmse],
         "rmse_x": [axis_rmse[0]],
         "rmse_y": [axis_rmse[1]],
         "rmse_z": [axis_rmse[2]],
@@ -1323,6 +1882,7 @@ def compute_score(
         "rom_grade_z": [rom_axis_grades[2]],
         "sensitivity": [sensitivity],
         "dtw_radius": [radius],
+        "dtw_abandoned": [dtw_abandoned],
         "shape_limit_m": [shape_limit_m],
         "patient_trajectory_source": [patient_trajectory_source],
         "weight_som": [weights.get("som", 0)],
@@ -1361,7 +1921,9 @@ def compute_score(
     report_df = pd.DataFrame({"report_text": [report_text]})
 
     results_xlsx_path = os.path.join(output_dir, "score_results.xlsx")
-    with pd.ExcelWriter(results_xlsx_path, engine="openpyxl") as writer:
+    # xlsxwriter's constant_memory mode is not used: pandas writes cells
+    # column by column, which that mode silently truncates.
+    with pd.ExcelWriter(results_xlsx_path, engine=_EXCEL_WRITE_ENGINE) as writer:
         scores_df.to_excel(writer, sheet_name="scores", index=False)
         sparc_df.to_excel(writer, sheet_name="sparc_raw", index=False)
         feedback_df.to_excel(writer, sheet_name="feedback", index=False)
@@ -1370,11 +1932,12 @@ def compute_score(
 
     print(f"[OK] Saved score results:    {results_xlsx_path}")
     print(f"[OK] Saved raw scores:       {raw_scores_path}")
-    print(f"[OK] Saved patient view:     {patient_view_path}")
-    print(f"[OK] Saved therapist view:   {therapist_view_path}")
-    print(f"[OK] Saved score plot:       {filtered_plot_path}")
+    if save_plots and not defer_plots:
+        print(f"[OK] Saved patient view:     {patient_view_path}")
+        print(f"[OK] Saved therapist view:   {therapist_view_path}")
+        print(f"[OK] Saved score plot:       {filtered_plot_path}")
 
-    return {
+    result = {
         "global_score": global_score_10,
         "dtw_score": dtw_score,
         "som_grade": som_grade,
@@ -1382,11 +1945,12 @@ def compute_score(
         "tempo_control_grade": tempo_control_g,
         "hesitation_grade": hesit_g,
         "tremor_grade": tremor_g,
-        "global_rmse": float(global_rmse),
-        "axis_rmse": {"X": axis_rmse[0], "Y": axis_rmse[1], "Z": axis_rmse[2]},
-        "rom_ratio_avg": float(rom_ratio),
-        "rom_ratios": {"X": float(rom_ratios[0]), "Y": float(rom_ratios[1]), "Z": float(rom_ratios[2])},
-        "rom_axis_grades": {"X": rom_axis_grades[0], "Y": rom_axis_grades[1], "Z": rom_axis_grades[2]},
+        "global_rmse": reported_rmse,
+        "axis_rmse": None if dtw_abandoned else dict(zip("XYZ", axis_rmse)),
+        "dtw_abandoned": dtw_abandoned,
+        "rom_ratio_avg": rom_ratio,
+        "rom_ratios": dict(zip("XYZ", rom_ratios.tolist())),
+        "rom_axis_grades": dict(zip("XYZ", rom_axis_grades)),
         "report_text": report_text,
         "commentary": commentary,
         "sparc": {
@@ -1404,6 +1968,14 @@ def compute_score(
             "score_plot_png": filtered_plot_path,
         },
     }
+    if return_trajectories:
+        result["trajectories"] = {
+            "template": _trajectory_payload(template_centered),
+            "patient": _trajectory_payload(query_centered),
+        }
+    if defer_plots and plot_renderers is not None:
+        result["plot_renderers"] = plot_renderers
+    return result
 
 
 def score_movement(
@@ -1412,6 +1984,11 @@ def score_movement(
     output_dir: str,
     velocity_buffer_pct: float = VELOCITY_BUFFER_PCT_DEFAULT,
     weights: dict | None = None,
+    save_plots: bool = True,
+    window: float | None = None,
+    abandon_threshold: float | None = None,
+    return_trajectories: bool = False,
+    defer_plots: bool = False,
 ) -> Dict:
     """
     Compatibility wrapper expected by `main_pipeline.py`.
@@ -1422,4 +1999,9 @@ def score_movement(
         output_dir=output_dir,
         velocity_buffer_pct=velocity_buffer_pct,
         weights=weights,
+        save_plots=save_plots,
+        window=window,
+        abandon_threshold=abandon_threshold,
+        return_trajectories=return_trajectories,
+        defer_plots=defer_plots,
     )
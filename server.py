@@ -13,7 +13,7 @@ Integrated Pipeline (Main → Analyze):
   5. Session Aggregation - weighted averages + global report
 
 Install:
-  pip install flask flask-cors numpy pandas tslearn openpyxl matplotlib mediapipe opencv-python pyrealsense2
+  pip install flask flask-cors numpy pandas tslearn dtaidistance openpyxl matplotlib mediapipe opencv-python pyrealsense2
 
 Run:
   python server.py
@@ -22,17 +22,45 @@ Run:
 import sys
 sys.modules['torch'] = None  # Prevent tslearn from crashing due to broken PyTorch DLLs
 
-from flask import Flask, jsonify, request
+from flask import Flask, Response, jsonify, request
+from flask.json.provider import DefaultJSONProvider
 from flask_cors import CORS
 import subprocess
 import threading
+import collections
+import functools
+import hashlib
+import secrets
 import os
 import io
 import base64
+import tempfile
 import time
 import json
 import numpy as np
 import pandas as pd
+
+# ── Optional pybase64 import (SIMD base64 for plot/Excel payloads) ─────────
+try:
+    import pybase64
+    _HAS_PYBASE64 = True
+except ImportError:
+    _HAS_PYBASE64 = False
+
+# ── Optional waitress import (multi-threaded production WSGI server) ─────
+try:
+    from waitress import serve as waitress_serve
+    _HAS_WAITRESS = True
+except ImportError:
+    _HAS_WAITRESS = False
+
+# ── Optional orjson import (fast JSON for base64/array-heavy responses) ────
+try:
+    import orjson
+    _HAS_ORJSON = True
+except ImportError:
+    _HAS_ORJSON = False
+
 import matplotlib
 matplotlib.use('Agg')
 import matplotlib.pyplot as plt
@@ -56,6 +84,7 @@ from score import (
     weighted_average,
     _extract_patient_global_trajectory_from_filtered,
     _require_columns,
+    _stride,
     TEMPLATE_COLS,
 )
 
@@ -67,15 +96,53 @@ from score import (
     get_shape_grade,
     generate_therapist_report,
     MovementAnalyzer,
+    plot_filtered_output,
+    use_fast_excel_reader,
+    warmup_dtw,
 )
 
+# Every stage's pd.read_excel goes through calamine when it is installed
+EXCEL_READ_ENGINE = use_fast_excel_reader()
+
+class ORJSONProvider(DefaultJSONProvider):
+    """
+    Flask JSON provider backed by orjson.
+
+    numpy scalars and arrays are serialised natively (no float()/tolist() at
+    the call site); keys stay sorted, and debug responses stay indented, as
+    with the default provider. Unlike the stdlib encoder, NaN/inf are
+    written as null, so responses are always valid JSON for the browser.
+    """
+
+    def dumps(self, obj, **kwargs):
+        option = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS | orjson.OPT_SORT_KEYS
+        if kwargs.get("indent"):
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(obj, default=self._fallback, option=option).decode("utf-8")
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+    @staticmethod
+    def _fallback(obj):
+        # numpy types orjson does not cover natively (e.g. float16, object arrays)
+        if isinstance(obj, (np.generic, np.ndarray)):
+            return obj.tolist()
+        return DefaultJSONProvider.default(obj)
+
+
 app = Flask(__name__)
+if _HAS_ORJSON:
+    app.json = ORJSONProvider(app)
 CORS(app)
 
 # ============================================================
 # CONFIGURATION
 # ============================================================
 MOCAP_ARM        = "right"   # Default arm if not specified by client
+SERVER_HOST      = "127.0.0.1"
+SERVER_PORT      = 5000
+SERVER_THREADS   = 8         # waitress worker threads
 # ============================================================
 
 OUTPUT_FOLDER    = os.path.join(ROOT_DIR, "output_excel")
@@ -87,25 +154,161 @@ CAPSTONE_WEIGHTS = SCORING_WEIGHTS
 
 _mocap_process = None
 _mocap_status  = {"state": "idle", "message": "", "output_file": None}
+_mocap_lock    = threading.RLock()
+_mocap_done    = threading.Event()   # set while state is "done" or "error"
+# Cap for /mocap/status?wait=<seconds>. Each waiting poll holds one of the
+# SERVER_THREADS workers for up to this long, so a few dashboard tabs
+# long-polling at 30 s would starve /analyze and /plot; at 5 s a client just
+# re-polls a little more often.
+MOCAP_STATUS_MAX_WAIT = 5.0
+MOCAP_LOG_TAIL_LINES = 200
+
+
+def _set_mocap_status(status):
+    """Replace the mocap status; wakes /mocap/status long-polls on done/error."""
+    global _mocap_status
+    with _mocap_lock:
+        _mocap_status = status
+        if status.get("state") in ("done", "error"):
+            _mocap_done.set()
+        else:
+            _mocap_done.clear()
+
+
+def _get_mocap_status():
+    """Snapshot of the mocap status."""
+    with _mocap_lock:
+        return dict(_mocap_status)
+
+
+def _claim_mocap(status):
+    """Set status unless a recording is in progress; True on success."""
+    with _mocap_lock:
+        if _mocap_status.get("state") == "recording":
+            return False
+        _set_mocap_status(status)
+        return True
+
+
+class _ThreadLogTail:
+    """
+    sys.stdout wrapper that keeps the last `maxlen` lines printed by watched
+    threads (the mocap workers), so /mocap/logs and /mocap/status can show
+    capture progress while it runs. Memory stays bounded however long the
+    recording is; every write still goes through to the real stream.
+    """
+
+    def __init__(self, stream, maxlen=MOCAP_LOG_TAIL_LINES):
+        self._stream = stream
+        self._lines = collections.deque(maxlen=maxlen)
+        self._partial = {}   # thread ident -> unterminated line
+        self._watched = set()
+        self._lock = threading.Lock()
+
+    def watch(self):
+        """Start collecting the calling thread's output (clears the tail)."""
+        with self._lock:
+            self._lines.clear()
+            self._watched.add(threading.get_ident())
+
+    def unwatch(self):
+        with self._lock:
+            ident = threading.get_ident()
+            self._watched.discard(ident)
+            rest = self._partial.pop(ident, "").strip()
+            if rest:
+                self._lines.append(rest)
+
+    def tail(self):
+        with self._lock:
+            return "\n".join(self._lines)
+
+    def last_line(self):
+        with self._lock:
+            return self._lines[-1] if self._lines else ""
+
+    def write(self, text):
+        n = self._stream.write(text)
+        ident = threading.get_ident()
+        if ident in self._watched:
+            with self._lock:
+                *lines, rest = (self._partial.pop(ident, "") + text).split("\n")
+                self._lines.extend(line.rstrip("\r") for line in lines if line.strip())
+                if rest:
+                    self._partial[ident] = rest
+        return n
+
+    def flush(self):
+        self._stream.flush()
+
+    def __getattr__(self, name):
+        return getattr(self._stream, name)
+
+
+_mocap_log = None
+
+
+def _mocap_log_tail():
+    """Install the stdout tail on first use and return it."""
+    global _mocap_log
+    if _mocap_log is None:
+        _mocap_log = sys.stdout = _ThreadLogTail(sys.stdout)
+    return _mocap_log
 _pipeline_state = {"state": "idle", "message": "", "progress": 0}
 
 # ── Utilities ─────────────────────────────────────────────────────────────────
 
-def latest_file_in(folder, extension=".xlsx"):
-    """Returns the most recently modified file with given extension."""
-    if not os.path.exists(folder):
+def _stat_or_none(path):
+    """os.stat(path), or None if it does not exist (one syscall, unlike exists() + a later stat)."""
+    try:
+        return os.stat(path)
+    except FileNotFoundError:
         return None
-    files = [os.path.join(folder, f) for f in os.listdir(folder) if f.endswith(extension)]
-    if not files:
+
+
+# (folder, extensions, skip_prefix) -> (directory st_mtime_ns, names)
+_listing_cache = {}
+
+
+def _list_files(folder, extensions, skip_prefix=None):
+    """
+    Names of regular files in folder ending with one of extensions, or
+    None when the folder does not exist.
+
+    The listing is reused while the directory's mtime is unchanged (adding,
+    removing or renaming an entry bumps it), so frequent UI polls cost one
+    stat() instead of a directory scan.
+    """
+    key = (folder, extensions, skip_prefix)
+    folder_stat = _stat_or_none(folder)
+    if folder_stat is None:
         return None
-    return max(files, key=os.path.getmtime)
+    mtime = folder_stat.st_mtime_ns
+    cached = _listing_cache.get(key)
+    if cached is not None and cached[0] == mtime:
+        return list(cached[1])
+    with os.scandir(folder) as it:
+        names = [
+            e.name for e in it
+            if e.name.endswith(extensions)
+            and not (skip_prefix and e.name.startswith(skip_prefix))
+            and e.is_file()
+        ]
+    _listing_cache[key] = (mtime, names)
+    return list(names)
+
+
+def _b64encode(data) -> str:
+    """Base64-encode bytes (or a buffer) to str, via pybase64 when installed."""
+    if _HAS_PYBASE64:
+        return pybase64.b64encode_as_string(data)
+    return base64.b64encode(data).decode("utf-8")
 
 
 def figure_to_base64(fig):
     buf = io.BytesIO()
     fig.savefig(buf, format="png", bbox_inches="tight", dpi=120, facecolor="#0a0d12")
-    buf.seek(0)
-    b64 = base64.b64encode(buf.read()).decode("utf-8")
+    b64 = _b64encode(buf.getbuffer())
     plt.close(fig)
     return b64
 
@@ -115,7 +318,7 @@ def excel_file_to_base64(excel_file_path):
     try:
         with open(excel_file_path, 'rb') as f:
             excel_data = f.read()
-        b64 = base64.b64encode(excel_data).decode("utf-8")
+        b64 = _b64encode(excel_data)
         print(f"[Excel] Converted to base64: {os.path.basename(excel_file_path)} ({len(excel_data)} bytes)")
         return b64
     except Exception as e:
@@ -172,9 +375,11 @@ def build_comparison_figure(ref_centered, pat_centered, score, report_text, spar
     else:
         ax1 = fig.add_subplot(1, 1, 1, projection="3d")
     ax1.set_facecolor("#111520")
-    ax1.plot(ref_centered[:, 0], ref_centered[:, 1], ref_centered[:, 2],
+    ref_plot = _stride(ref_centered)
+    pat_plot = _stride(pat_centered)
+    ax1.plot(ref_plot[:, 0], ref_plot[:, 1], ref_plot[:, 2],
              color="#0059ff", linestyle="--", linewidth=1.5, label="Expert (centred)")
-    ax1.plot(pat_centered[:, 0], pat_centered[:, 1], pat_centered[:, 2],
+    ax1.plot(pat_plot[:, 0], pat_plot[:, 1], pat_plot[:, 2],
              color="#00e5c3", linewidth=2.5, label="Patient (centred)")
     ax1.set_title(f"DTW Score: {score}/100", color="#00e5c3", fontsize=14, fontweight="bold", pad=10)
     ax1.legend(facecolor="#1a2030", labelcolor="#e8edf5", edgecolor="#232a3a", fontsize=8)
@@ -282,8 +487,7 @@ def generate_comparison_plot(first_attempt, all_attempts, exercise_type="eight_t
         # Convert to base64
         buf = io.BytesIO()
         fig.savefig(buf, format='png', facecolor='#0f1419', dpi=100, bbox_inches='tight')
-        buf.seek(0)
-        image_b64 = base64.b64encode(buf.read()).decode()
+        image_b64 = _b64encode(buf.getbuffer())
         plt.close(fig)
         return image_b64
     except Exception as e:
@@ -293,10 +497,110 @@ def generate_comparison_plot(first_attempt, all_attempts, exercise_type="eight_t
 
 # ═══════════════════════════════════════════════════════════════════════════
 
+def _optional_float(data, key):
+    """`float(data[key])`, or None when the key is absent or null."""
+    value = data.get(key)
+    return None if value is None else float(value)
+
+
+def _dtw_options(data):
+    """
+    (`window`, `abandon_threshold`) from the request body, None when absent.
+
+    Raises ValueError with a client-facing message unless `window` is a
+    finite fraction in (0, 1] and `abandon_threshold` a finite number > 0.
+    """
+    try:
+        window = _optional_float(data, "window")
+        abandon_threshold = _optional_float(data, "abandon_threshold")
+    except (TypeError, ValueError):
+        raise ValueError("window and abandon_threshold must be numbers")
+    if window is not None and not (np.isfinite(window) and 0 < window <= 1):
+        raise ValueError("window must be a finite fraction in (0, 1]")
+    if abandon_threshold is not None and not (np.isfinite(abandon_threshold) and abandon_threshold > 0):
+        raise ValueError("abandon_threshold must be a finite number > 0")
+    return window, abandon_threshold
+
+
+def _optional_bool(data, key, default):
+    """`data[key]` as a JSON boolean, `default` when absent or null; TypeError otherwise."""
+    value = data.get(key)
+    if value is None:
+        return default
+    if not isinstance(value, bool):
+        raise TypeError(f"{key} must be true or false")
+    return value
+
+
+def _include_plot(data):
+    """False when the client opts out of PNGs with ?plot=0 or "include_plot": false."""
+    if request.args.get("plot") == "0":
+        return False
+    return _optional_bool(data, "include_plot", True)
+
+
+def _plot_urls(data):
+    """True when the client wants /plot/<token> URLs (?plot=url or "plot_urls": true)."""
+    return request.args.get("plot") == "url" or _optional_bool(data, "plot_urls", False)
+
+
+# PNGs served by /plot/<token>, least recently used first: token -> bytes,
+# or a deferred render(output_dir=...) -> PNG path that the first
+# GET /plot/<token> draws and replaces with its bytes.
+_PLOT_CACHE = collections.OrderedDict()
+_PLOT_CACHE_MAX = 50
+_plot_cache_lock = threading.Lock()
+
+
+def _store_plot(token, entry):
+    with _plot_cache_lock:
+        _PLOT_CACHE[token] = entry
+        _PLOT_CACHE.move_to_end(token)
+        while len(_PLOT_CACHE) > _PLOT_CACHE_MAX:
+            _PLOT_CACHE.popitem(last=False)
+
+
+def _cache_plot(png_bytes):
+    """Keep png_bytes in the LRU plot cache and return its /plot/<token> URL."""
+    # Content-addressed, so re-analysing the same data reuses the URL
+    # (and the browser's cached copy).
+    token = hashlib.sha1(png_bytes).hexdigest()[:20]
+    _store_plot(token, png_bytes)
+    return f"/plot/{token}"
+
+
+def _defer_plot(render):
+    """Register an unrendered plot; it is drawn when its URL is first fetched."""
+    token = secrets.token_hex(10)
+    _store_plot(token, render)
+    return f"/plot/{token}"
+
+
+def _render_deferred_plot(render):
+    """Draw a deferred plot into a scratch directory and return the PNG bytes."""
+    with tempfile.TemporaryDirectory() as tmp:
+        with open(render(output_dir=tmp), "rb") as f:
+            return f.read()
+
+
 def run_multi_attempt_analysis(patient_file, template_file, exercise_type="eight_tracing", 
-                               n_attempts=None, weights=None):
+                               n_attempts=None, weights=None, dtw_window=None,
+                               abandon_threshold=None, include_plot=True,
+                               plot_urls=False):
     """
     Complete multi-attempt analysis pipeline.
+
+    dtw_window / abandon_threshold are forwarded to score_movement (Sakoe-Chiba
+    band as a fraction of the trajectory length, and the global RMSE in metres
+    past which an attempt's DTW alignment is abandoned).
+
+    include_plot=False skips every PNG (per-attempt and session plots); each
+    attempt then carries its strided "trajectories" instead. plot_urls=True
+    returns "/plot/<token>" URLs ("*_plot_url", per-attempt "plot_url" /
+    "patient_view_url") in place of the base64 PNG fields, which stay empty.
+    Those plots are only drawn when their URL is fetched, except the
+    session-attempts overlay: it reads the attempt slices from the shared
+    temp directory, which the next analysis overwrites.
     
     Returns dict with:
     {
@@ -314,12 +618,12 @@ def run_multi_attempt_analysis(patient_file, template_file, exercise_type="eight
     pat_path = os.path.join(OUTPUT_FOLDER, patient_file)
     ref_path = os.path.join(TEMPLATES_FOLDER, template_file)
     
-    if not os.path.exists(pat_path):
+    if _stat_or_none(pat_path) is None:
         raise FileNotFoundError(f"Patient file not found: {patient_file}")
-    if not os.path.exists(ref_path):
-        ref_path = os.path.join(TEMPLATES_FOLDER, template_file)
-        if not os.path.exists(ref_path):
-            raise FileNotFoundError(f"Template file not found in templates/: {template_file}")
+    # One stat for the template, reused by every attempt's scale step
+    ref_stat = _stat_or_none(ref_path)
+    if ref_stat is None:
+        raise FileNotFoundError(f"Template file not found in templates/: {template_file}")
     
     # Get weights
     if weights is None:
@@ -374,7 +678,8 @@ def run_multi_attempt_analysis(patient_file, template_file, exercise_type="eight
             scaled_template_path = scale_template_file(
                 template_path=ref_path,
                 patient_normalized_path=normalized_path,
-                output_dir=attempt_out_dir
+                output_dir=attempt_out_dir,
+                template_stat=ref_stat,
             )
             
             # Score this attempt
@@ -383,7 +688,12 @@ def run_multi_attempt_analysis(patient_file, template_file, exercise_type="eight
                 template_scaled_path=scaled_template_path,
                 output_dir=attempt_out_dir,
                 velocity_buffer_pct=0.10,
-                weights=weights
+                weights=weights,
+                window=dtw_window,
+                abandon_threshold=abandon_threshold,
+                save_plots=include_plot,
+                return_trajectories=not include_plot,
+                defer_plots=plot_urls,
             )
             
             # Debug: Log what we got back
@@ -400,10 +710,17 @@ def run_multi_attempt_analysis(patient_file, template_file, exercise_type="eight
                 "hesitation_grade":   attempt_result.get("hesitation_grade", 0),
                 "tremor_grade":       attempt_result.get("tremor_grade", 0),
                 "global_rmse":        attempt_result.get("global_rmse", 0),
+                "dtw_abandoned":      attempt_result.get("dtw_abandoned", False),
                 "rom_ratio_avg":      attempt_result.get("rom_ratio_avg", 0),
                 "plot_path":          attempt_result.get("saved", {}).get("therapist_view_png"),
                 "patient_view_path":  attempt_result.get("saved", {}).get("patient_view_png"),
             }
+            if not include_plot:
+                attempt_score["trajectories"] = attempt_result["trajectories"]
+            elif plot_urls:
+                renderers = attempt_result["plot_renderers"]
+                attempt_score["plot_url"] = _defer_plot(renderers["therapist_view_png"])
+                attempt_score["patient_view_url"] = _defer_plot(renderers["patient_view_png"])
             per_attempt_details.append(attempt_score)
             per_attempt_scores.append(attempt_score["global_score"])
         
@@ -435,21 +752,30 @@ def run_multi_attempt_analysis(patient_file, template_file, exercise_type="eight
         def encode_image(path):
             if path and os.path.exists(path):
                 with open(path, "rb") as f:
-                    return base64.b64encode(f.read()).decode("utf-8")
+                    png = f.read()
+                return _cache_plot(png) if plot_urls else _b64encode(png)
             return ""
 
         # Import session-level plot functions from main_pipeline.py
-        try:
-            from main_pipeline import plot_session_attempts, plot_global_report
-            session_attempts_plot_path = plot_session_attempts(attempt_paths, temp_dir)
-            session_attempts_plot_b64  = encode_image(session_attempts_plot_path)
-            global_report_plot_b64     = encode_image(
-                plot_global_report(per_attempt_details, weights, temp_dir)
-            )
-        except Exception as plot_err:
-            print(f"[WARN] Could not generate session plots: {plot_err}")
-            session_attempts_plot_b64 = ""
-            global_report_plot_b64    = ""
+        session_attempts_plot_b64 = ""
+        global_report_plot_b64    = ""
+        if include_plot:
+            try:
+                from main_pipeline import plot_session_attempts, plot_global_report
+                session_attempts_plot_path = plot_session_attempts(attempt_paths, temp_dir)
+                session_attempts_plot_b64  = encode_image(session_attempts_plot_path)
+                if plot_urls:
+                    global_report_plot_b64 = _defer_plot(
+                        functools.partial(plot_global_report, per_attempt_details, weights)
+                    )
+                else:
+                    global_report_plot_b64 = encode_image(
+                        plot_global_report(per_attempt_details, weights, temp_dir)
+                    )
+            except Exception as plot_err:
+                print(f"[WARN] Could not generate session plots: {plot_err}")
+                session_attempts_plot_b64 = ""
+                global_report_plot_b64    = ""
 
         attempt_progression = {
             "avg_score":                round(float(np.mean(per_attempt_scores)), 2),
@@ -459,6 +785,18 @@ def run_multi_attempt_analysis(patient_file, template_file, exercise_type="eight
             "trend": "improving" if improvement > 0.5 else "declining" if improvement < -0.5 else "stable"
         }
         
+        session_plot_fields = {
+            "session_attempts_plot_b64": session_attempts_plot_b64,
+            "global_report_plot_b64":    global_report_plot_b64,
+        }
+        if plot_urls:
+            session_plot_fields = {
+                "session_attempts_plot_b64": "",
+                "global_report_plot_b64":    "",
+                "session_attempts_plot_url": session_attempts_plot_b64 or None,
+                "global_report_plot_url":    global_report_plot_b64 or None,
+            }
+
         return {
             # Session-level scores (all out of 10)
             "global_score":             session_scores["global_score"],
@@ -475,9 +813,8 @@ def run_multi_attempt_analysis(patient_file, template_file, exercise_type="eight
             "per_attempt_metrics":      per_attempt_details,  # full detail per attempt
             "attempt_progression":      attempt_progression,
 
-            # Plots (base64 PNG)
-            "session_attempts_plot_b64": session_attempts_plot_b64,
-            "global_report_plot_b64":    global_report_plot_b64,
+            # Plots (base64 PNG, or /plot/<token> URLs with plot_urls)
+            **session_plot_fields,
 
             # Meta
             "exercise_type":            exercise_type,
@@ -506,10 +843,8 @@ def health():
 def get_templates():
     """List all available exercise template files."""
     try:
-        if not os.path.exists(TEMPLATES_FOLDER):
-            return jsonify({"templates": []})
-        templates = [f for f in os.listdir(TEMPLATES_FOLDER) if f.endswith(('.xlsx', '.xls'))]
-        return jsonify({"templates": sorted(templates)})
+        templates = _list_files(TEMPLATES_FOLDER, ('.xlsx', '.xls'))
+        return jsonify({"templates": sorted(templates or [])})
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
@@ -518,10 +853,8 @@ def get_templates():
 def get_patient_files():
     """List all recorded patient motion files."""
     try:
-        if not os.path.exists(OUTPUT_FOLDER):
-            return jsonify({"files": []})
-        files = [f for f in os.listdir(OUTPUT_FOLDER) if f.endswith(('.xlsx', '.xls')) and not f.startswith('_temp')]
-        return jsonify({"files": sorted(files, reverse=True)})  # Most recent first
+        files = _list_files(OUTPUT_FOLDER, ('.xlsx', '.xls'), skip_prefix='_temp')
+        return jsonify({"files": sorted(files or [], reverse=True)})  # Most recent first
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
@@ -542,7 +875,11 @@ def pipeline_analyze():
       "template_file": "...",
       "exercise_type": "eight_tracing",
       "n_attempts": null,
-      "weights_override": null
+      "weights_override": null,
+      "window": null,             // Sakoe-Chiba band, fraction of length
+      "abandon_threshold": null,  // global RMSE (m) to stop DTW early
+      "include_plot": true,       // false (or ?plot=0): no PNGs, trajectories instead
+      "plot_urls": false          // true (or ?plot=url): /plot/<token> URLs, not base64
     }
     """
     data = request.get_json(force=True)
@@ -553,6 +890,15 @@ def pipeline_analyze():
     exercise_type = normalize_exercise_type(exercise_type_raw)  # "Eight Tracing" -> "eight_tracing"
     n_attempts = data.get("n_attempts")
     weights_override = data.get("weights_override")
+    try:
+        dtw_window, abandon_threshold = _dtw_options(data)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    try:
+        include_plot = _include_plot(data)
+        plot_urls = _plot_urls(data)
+    except TypeError as e:
+        return jsonify({"error": str(e)}), 400
     
     print(f"[INFO] Exercise type: '{exercise_type_raw}' -> normalized: '{exercise_type}'")
     
@@ -567,7 +913,11 @@ def pipeline_analyze():
             template_file=template_file,
             exercise_type=exercise_type,
             n_attempts=n_attempts,
-            weights=weights
+            weights=weights,
+            dtw_window=dtw_window,
+            abandon_threshold=abandon_threshold,
+            include_plot=include_plot,
+            plot_urls=plot_urls,
         )
         
         return jsonify(result)
@@ -593,11 +943,6 @@ def mocap_start():
       "gesture_enabled": false
     }
     """
-    global _mocap_status
-
-    if _mocap_status.get("state") == "recording":
-        return jsonify({"error": "Recording already in progress"}), 400
-
     data = request.get_json(force=True)
     duration        = float(data.get("duration", 8))
     grace           = float(data.get("grace", 5))
@@ -605,14 +950,18 @@ def mocap_start():
     arm             = data.get("arm", MOCAP_ARM)
     gesture_enabled = bool(data.get("gesture_enabled", False))
 
-    _mocap_status = {
+    # Check-and-set under the lock so two clicks cannot start two captures
+    if not _claim_mocap({
         "state": "recording",
         "message": f"Camera opening — press SPACE in the camera window to start…",
         "output_file": None,
-    }
+    }):
+        return jsonify({"error": "Recording already in progress"}), 400
+
+    log = _mocap_log_tail()
 
     def run():
-        global _mocap_status
+        log.watch()
         try:
             raw_path, selected_arm = run_capture(
                 patient_name="patient",
@@ -626,19 +975,21 @@ def mocap_start():
                 gesture_hold_seconds=2.0,
                 camera_source="realsense",
             )
-            _mocap_status = {
+            _set_mocap_status({
                 "state": "done",
                 "message": "Recording complete. Ready to analyze.",
                 "output_file": os.path.basename(raw_path),
-            }
+            })
         except Exception as e:
             import traceback
-            _mocap_status = {
+            _set_mocap_status({
                 "state": "error",
                 "message": str(e),
                 "full_stderr": traceback.format_exc(),
                 "output_file": None,
-            }
+            })
+        finally:
+            log.unwatch()
 
     threading.Thread(target=run, daemon=True).start()
     return jsonify({"status": "started"})
@@ -661,9 +1012,9 @@ def mocap_unity_start():
       "arm": "right"
     }
     """
-    global _mocap_status, unity_bridge_instance, unity_process
+    global unity_bridge_instance, unity_process
 
-    if _mocap_status.get("state") in ("recording", "analyzing"):
+    if _get_mocap_status().get("state") in ("recording", "analyzing"):
         # Let's forcefully reset it to allow a new session
         print("[Server] Forcefully overriding previous stuck mocap session.")
         if globals().get('unity_bridge_instance') is not None:
@@ -677,22 +1028,24 @@ def mocap_unity_start():
             except Exception:
                 pass
             unity_process = None
-        _mocap_status = {"state": "idle", "message": "Ready", "output_file": None}
+        _set_mocap_status({"state": "idle", "message": "Ready", "output_file": None})
 
     data     = request.get_json(force=True)
     duration = float(data.get("duration", 20))
     exercise = normalize_exercise_type(data.get("exercise", "eight_tracing"))
     arm      = data.get("arm", MOCAP_ARM)
 
-    _mocap_status = {
+    _set_mocap_status({
         "state":       "recording",
         "message":     "Unity session starting\u2026 waiting for game to boot.",
         "output_file": None,
-    }
+    })
+
+    log = _mocap_log_tail()
 
     def run():
-        global _mocap_status
         bridge = None
+        log.watch()
         try:
             # 1. Launch Unity executable (non-blocking)
             unity_exe = os.path.join(ROOT_DIR, "UnityPipeline", "Builds", "Body control 3D model.exe")
@@ -724,11 +1077,11 @@ def mocap_unity_start():
             )
             raw_path = unity_bridge_instance.run()   # blocks until duration elapsed
 
-            _mocap_status = {
+            _set_mocap_status({
                 "state":       "analyzing",
                 "message":     "Recording complete. Running analysis pipeline\u2026",
                 "output_file": os.path.basename(raw_path),
-            }
+            })
 
             # 3. Full scoring pipeline (same as normal pipeline)
             template_file = _template_for_exercise(exercise)
@@ -745,22 +1098,23 @@ def mocap_unity_start():
             unity_bridge_instance.close()
             unity_bridge_instance = None
 
-            _mocap_status = {
+            _set_mocap_status({
                 "state":       "done",
                 "message":     "Gamified session complete.",
                 "output_file": os.path.basename(raw_path),
                 "result":      result,
-            }
+            })
 
         except Exception as e:
             import traceback
-            _mocap_status = {
+            _set_mocap_status({
                 "state":      "error",
                 "message":    str(e),
                 "full_stderr": traceback.format_exc(),
                 "output_file": None,
-            }
+            })
         finally:
+            log.unwatch()
             if bridge:
                 bridge.close()
 
@@ -779,63 +1133,118 @@ def _template_for_exercise(exercise_type: str) -> str:
     return mapping.get(exercise_type, "8_tracing_right_wrist_template.xlsx")
 
 
+@app.route("/plot/<token>", methods=["GET"])
+def get_plot(token):
+    """Serve a PNG registered by an analysis run with plot_urls, drawing it on first fetch."""
+    with _plot_cache_lock:
+        png = _PLOT_CACHE.get(token)
+        if png is not None:
+            _PLOT_CACHE.move_to_end(token)
+    if png is None:
+        return jsonify({"error": "Plot not found (expired from cache)"}), 404
+    if callable(png):
+        # Rendered outside the lock; two concurrent first fetches both draw
+        # it, and either result is kept.
+        try:
+            png = _render_deferred_plot(png)
+        except Exception as e:
+            return jsonify({"error": f"Could not render plot: {e}"}), 500
+        with _plot_cache_lock:
+            if token in _PLOT_CACHE:
+                _PLOT_CACHE[token] = png
+    return Response(png, mimetype="image/png", headers={"Cache-Control": "max-age=3600"})
+
+
 @app.route("/mocap/status", methods=["GET"])
 def mocap_status():
-    return jsonify(_mocap_status)
+    """
+    Current mocap state, plus the latest line the capture printed.
+
+    ?wait=<seconds> long-polls: while a session is recording/analyzing the
+    request blocks until it finishes (done/error) or the timeout passes
+    (capped at MOCAP_STATUS_MAX_WAIT), replacing 1 Hz polling. The done
+    state sticks until the next session or /mocap/stop.
+    """
+    try:
+        wait = min(float(request.args.get("wait", 0)), MOCAP_STATUS_MAX_WAIT)
+    except ValueError:
+        return jsonify({"error": "wait must be a number of seconds"}), 400
+    if wait > 0 and _get_mocap_status().get("state") in ("recording", "analyzing"):
+        _mocap_done.wait(timeout=wait)
+    status = _get_mocap_status()
+    if _mocap_log is not None:
+        status["last_log_line"] = _mocap_log.last_line()
+    return jsonify(status)
 
 
 @app.route("/mocap/logs", methods=["GET"])
 def mocap_logs():
-    """Returns full stderr output from the last mocap run."""
+    """Returns stderr (traceback) and the stdout tail from the last mocap run."""
+    status = _get_mocap_status()
     return jsonify({
-        "full_stderr": _mocap_status.get("full_stderr", ""),
-        "stdout": _mocap_status.get("stdout", ""),
-        "state": _mocap_status.get("state", "idle"),
+        "full_stderr": status.get("full_stderr", ""),
+        "stdout": _mocap_log.tail() if _mocap_log is not None else "",
+        "state": status.get("state", "idle"),
     })
 
 
 @app.route("/mocap/stop", methods=["POST"])
 def mocap_stop():
     """Reset mocap status (gamified sessions end automatically)."""
-    global _mocap_status
-    _mocap_status = {"state": "idle", "message": "", "output_file": None}
+    _set_mocap_status({"state": "idle", "message": "", "output_file": None})
     return jsonify({"status": "reset"})
 
 
 @app.route("/files/patient", methods=["GET"])
 def list_patient_files():
     """Returns list of all recorded patient Excel files."""
-    if not os.path.exists(OUTPUT_FOLDER):
-        return jsonify([])
-    files = [f for f in os.listdir(OUTPUT_FOLDER) if f.endswith(".xlsx")]
-    return jsonify(files)
+    files = _list_files(OUTPUT_FOLDER, ".xlsx")
+    return jsonify(files or [])
 
 @app.route("/analyze", methods=["POST"])
 def analyze_legacy():
     """
     Legacy single-attempt analysis endpoint.
     Now uses weighted scoring but processes single attempt only.
+
+    Optional body fields "window" (Sakoe-Chiba band as a fraction of the
+    trajectory length) and "abandon_threshold" (global RMSE in metres past
+    which the DTW alignment is abandoned) are passed to score_movement.
+    "include_plot": false (or ?plot=0) skips the PNGs and returns the strided
+    mean-centred "trajectories" for client-side plotting; "plot_urls": true
+    (or ?plot=url) adds "plot_url" / "patient_view_url", drawn when fetched.
     """
     data = request.get_json(force=True)
 
     patient_file = data.get("patient_file")
     template_file = data.get("template_file")
-    exercise_type = data.get("exercise_type", "eight_tracing")
-    sensitivity = float(data.get("sensitivity", 3.0))
-    shape_tolerance = float(data.get("shape_tolerance", 0.20))
-
     if not patient_file or not template_file:
         return jsonify({"error": "patient_file and template_file are required"}), 400
 
+    exercise_type = data.get("exercise_type", "eight_tracing")
+    try:
+        include_plot = _include_plot(data)
+        plot_urls = _plot_urls(data) and include_plot
+    except TypeError as e:
+        return jsonify({"error": str(e)}), 400
+    try:
+        sensitivity = float(data.get("sensitivity", 3.0))
+        shape_tolerance = float(data.get("shape_tolerance", 0.20))
+    except (TypeError, ValueError):
+        return jsonify({"error": "sensitivity and shape_tolerance must be numbers"}), 400
+    try:
+        dtw_window, abandon_threshold = _dtw_options(data)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
     pat_path = os.path.join(OUTPUT_FOLDER, patient_file)
     ref_path = os.path.join(TEMPLATES_FOLDER, template_file)
 
-    if not os.path.exists(pat_path):
+    if _stat_or_none(pat_path) is None:
         return jsonify({"error": f"Patient file not found: {patient_file}"}), 404
-    if not os.path.exists(ref_path):
-        ref_path = os.path.join(TEMPLATES_FOLDER, template_file)
-        if not os.path.exists(ref_path):
-            return jsonify({"error": f"Template file not found: {template_file}"}), 404
+    ref_stat = _stat_or_none(ref_path)
+    if ref_stat is None:
+        return jsonify({"error": f"Template file not found: {template_file}"}), 404
 
     try:
         temp_dir = os.path.join(OUTPUT_FOLDER, "_temp_pipeline")
@@ -846,6 +1255,7 @@ def analyze_legacy():
             template_path=ref_path,
             patient_normalized_path=pat_path,
             output_dir=temp_dir,
+            template_stat=ref_stat,
         )
 
         # Get weights for this exercise
@@ -857,26 +1267,38 @@ def analyze_legacy():
             template_scaled_path=scaled_template_path,
             output_dir=temp_dir,
             velocity_buffer_pct=0.10,
-            weights=weights
+            weights=weights,
+            window=dtw_window,
+            abandon_threshold=abandon_threshold,
+            save_plots=include_plot,
+            return_trajectories=not include_plot,
+            defer_plots=plot_urls,
         )
 
-        return jsonify({
-            "score": result["final_score"],
-            "global_score": result["final_score"],  # New field
+        response = {
+            "score": result["global_score"],
+            "global_score": result["global_score"],  # New field
             "global_rmse": result["global_rmse"],
             "axis_rmse": result.get("axis_rmse", {}),
-            "rom_ratio": result.get("rom_ratio", 0),
+            "dtw_abandoned": result.get("dtw_abandoned", False),
+            "rom_ratio": result.get("rom_ratio_avg", 0),
             "rom_ratios": result.get("rom_ratios", {}),
             "rom_axis_grades": result.get("rom_axis_grades", []),
-            "avg_rom_grade": result.get("avg_rom_grade", 0),
-            "shape_grade": result.get("shape_grade", 0),
+            "avg_rom_grade": result["rom_grade"],
+            "shape_grade": result["som_grade"],
             "sparc": result.get("sparc", {}),
-            "weighted_components": result.get("weighted_components", {}),
             "report_text": result.get("report_text", ""),
             "plot_image_b64": result.get("plot_image_b64", ""),
             "exercise_type": exercise_type,
             "num_attempts": 1  # Legacy single-attempt
-        })
+        }
+        if not include_plot:
+            response["trajectories"] = result["trajectories"]
+        elif plot_urls:
+            renderers = result["plot_renderers"]
+            response["plot_url"] = _defer_plot(renderers["therapist_view_png"])
+            response["patient_view_url"] = _defer_plot(renderers["patient_view_png"])
+        return jsonify(response)
 
     except Exception as e:
         import traceback
@@ -886,6 +1308,33 @@ def analyze_legacy():
         }), 500
 
 
+def _warmup():
+    """
+    Pay the one-off first-request costs: the Numba DTW JIT, the Excel reader
+    import, and matplotlib's font cache / 3-D Agg renderer (via a
+    throwaway `plot_filtered_output`, the same path /analyze renders with).
+    """
+    t0 = time.perf_counter()
+    try:
+        dtw_s = warmup_dtw()
+        rng = np.random.default_rng(0)
+        ref = rng.random((64, 3), dtype=np.float32)
+        pat = rng.random((64, 3), dtype=np.float32)
+        calculate_mdtw_with_sensitivity(ref, pat, 3.0)
+        calculate_rom_metrics(ref, pat)
+        with tempfile.TemporaryDirectory() as tmp:
+            plot_filtered_output(ref, pat, tmp)
+
+        buf = io.BytesIO()
+        pd.DataFrame(ref, columns=TEMPLATE_COLS).to_excel(buf, index=False)
+        buf.seek(0)
+        pd.read_excel(buf, engine=EXCEL_READ_ENGINE)
+    except Exception as e:
+        print(f"[WARN] Warm-up failed (first request will be slower): {e}")
+        return
+    print(f"[INFO] Warm-up finished in {time.perf_counter() - t0:.2f}s (DTW JIT {dtw_s:.2f}s)")
+
+
 if __name__ == "__main__":
     print("=" * 60)
     print("PhysioSync Local Backend")
@@ -893,6 +1342,16 @@ if __name__ == "__main__":
     print(f"Output folder:    {OUTPUT_FOLDER}")
     print(f"Templates folder: {TEMPLATES_FOLDER}")
     print(f"Scoring weights:  {SCORING_WEIGHTS}")
+    print(f"Excel reader:     {EXCEL_READ_ENGINE}")
     print(f"Capture module:   capture.py (in-process, gesture_enabled=False)")
+    print(f"WSGI server:      {f'waitress ({SERVER_THREADS} threads)' if _HAS_WAITRESS else 'werkzeug (dev, threaded)'}")
     print("=" * 60)
-    app.run(host="127.0.0.1", port=5000, debug=True)
+    # Warm in the background so the port opens immediately
+    threading.Thread(target=_warmup, name="warmup", daemon=True).start()
+    # Mocap/pipeline state lives in module globals, so scale with threads in
+    # one process (not multiple gunicorn workers).
+    if _HAS_WAITRESS:
+        waitress_serve(app, host=SERVER_HOST, port=SERVER_PORT, threads=SERVER_THREADS)
+    else:
+        print("[WARN] waitress not installed; falling back to the Flask dev server")
+        app.run(host=SERVER_HOST, port=SERVER_PORT, debug=True, threaded=True)
@@ -112,7 +112,7 @@ class MotionCaptureApp:
             print("   Falling back to MediaPipe Solutions API (less accurate).")
             self.use_tasks_api = False
             self._mp_pose = mp.solutions.pose.Pose(
-                model_complexity=1, smooth_landmarks=True
+                model_complexity=0, smooth_landmarks=True
             )
             return
 
@@ -137,7 +137,7 @@ class MotionCaptureApp:
             print("   Falling back to MediaPipe Solutions API (less accurate).")
             self.use_tasks_api = False
             self._mp_pose = mp.solutions.pose.Pose(
-                model_complexity=1, smooth_landmarks=True
+                model_complexity=0, smooth_landmarks=True
             )
 
     # ── Camera setup ──────────────────────────────────────────────────────────
@@ -324,8 +324,8 @@ class MotionCaptureApp:
 
                 landmarks = self._detect(image_rgb, timestamp_ms)
 
-                image_rgb.flags.writeable = True
-                image_bgr = cv2.cvtColor(image_rgb, cv2.COLOR_RGB2BGR)
+                # Draw on the original BGR frame; no RGB→BGR round-trip
+                image_bgr = image
 
                 if landmarks:
                     self._draw_landmarks(image_bgr, landmarks)
@@ -0,0 +1,90 @@
+"""
+Regression tests for the pruned Numba DTW kernel in score.py.
+
+Pruning with any bound at or above the optimal cost must not change the
+result, and the unbounded kernel must match tslearn's Sakoe-Chiba DTW.
+"""
+
+import os
+import sys
+
+import numpy as np
+import pytest
+
+pytest.importorskip("numba")
+tslearn_metrics = pytest.importorskip("tslearn.metrics")
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import score  # noqa: E402
+
+RADIUS = 10
+
+
+def _random_pairs(count, seed=0):
+    """Unequal-length 3-axis series, as float64 so tslearn sees the same input."""
+    rng = np.random.default_rng(seed)
+    for _ in range(count):
+        n, m = rng.integers(20, 200, 2)
+        yield rng.normal(size=(n, 3)), rng.normal(size=(m, 3))
+
+
+@pytest.mark.parametrize("slack", [1.0001, 1.01, 1.5])
+def test_pruned_matches_unbounded(slack):
+    for a, b in _random_pairs(200):
+        path_inf, cost_inf = score._dtw_path_numba(a, b, RADIUS, np.inf)
+        path, cost = score._dtw_path_numba(a, b, RADIUS, cost_inf * slack)
+        np.testing.assert_array_equal(path, path_inf)
+        assert cost == cost_inf
+
+
+def _check_staircase_bound(a, b, radius):
+    path_inf, cost_inf = score._dtw_path_numba(a, b, radius, np.inf)
+    ub = score._staircase_upper_bound(a, b)
+    # Summation order alone can put the two costs an ulp apart
+    assert ub >= cost_inf * (1 - 1e-12)
+    path, cost = score._dtw_path_numba(a, b, radius, ub * (1 + score._STAIRCASE_BOUND_SLACK))
+    np.testing.assert_array_equal(path, path_inf)
+    assert cost == cost_inf
+
+
+def test_staircase_bound_is_valid_and_exact():
+    for a, b in _random_pairs(200, seed=1):
+        _check_staircase_bound(a, b, RADIUS)
+
+
+@pytest.mark.parametrize("n, m", [(1, 1), (1, 7), (7, 1), (2, 9), (9, 2), (50, 51)])
+@pytest.mark.parametrize("radius", [0, 1, 3])
+def test_staircase_bound_short_series(n, m, radius):
+    rng = np.random.default_rng(n * 100 + m)
+    _check_staircase_bound(rng.normal(size=(n, 3)), rng.normal(size=(m, 3)), radius)
+
+
+def test_unbounded_matches_tslearn():
+    for a, b in _random_pairs(200, seed=2):
+        path, cost = score._dtw_path_numba(a, b, RADIUS, np.inf)
+        ts_path, ts_dist = tslearn_metrics.dtw_path(
+            a, b, global_constraint="sakoe_chiba", sakoe_chiba_radius=RADIUS
+        )
+        np.testing.assert_array_equal(path, np.asarray(ts_path))
+        assert np.sqrt(cost) == pytest.approx(ts_dist, rel=1e-9)
+
+
+def test_bound_below_optimum_abandons():
+    for a, b in _random_pairs(50, seed=3):
+        _, cost_inf = score._dtw_path_numba(a, b, RADIUS, np.inf)
+        path, cost = score._dtw_path_numba(a, b, RADIUS, cost_inf * 0.99)
+        assert path.shape == (0, 2)
+        assert cost == np.inf
+
+
+def test_dtw_path_matches_unbounded_float32():
+    for a, b in _random_pairs(100, seed=4):
+        a, b = score._mean_center(a), score._mean_center(b)
+        expected, _ = score._dtw_path_numba(a, b, RADIUS, np.inf)
+        np.testing.assert_array_equal(score._dtw_path(a, b, RADIUS), expected)
+
+
+def test_dtw_path_identical_series():
+    a = score._mean_center(np.random.default_rng(5).normal(size=(80, 3)))
+    path = score._dtw_path(a, a.copy(), RADIUS)
+    np.testing.assert_array_equal(path, np.column_stack([np.arange(80)] * 2))
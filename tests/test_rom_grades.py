@@ -0,0 +1,77 @@
+"""
+Boundary tests for the searchsorted ROM grading in score.py.
+
+get_rom_grades replaced an if/elif ladder; the ladder is kept here as the
+reference and both are compared at every band edge, one ulp either side,
+and on NaN / inf.
+"""
+
+import os
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import score  # noqa: E402
+
+THRESHOLDS = [0.30, 0.60, 0.80, 0.90, 1.10, 1.20, 1.50, 1.80]
+
+
+def _ladder_rom_grade(ratio):
+    """The get_rom_grade branching before the lookup table."""
+    if ratio < 0.30 or ratio > 1.80:
+        return 0
+
+    if 0.90 <= ratio <= 1.10:
+        return 10
+
+    if ratio < 0.90:
+        if ratio >= 0.80:
+            return 9
+        elif ratio >= 0.60:
+            return 8
+        else:
+            return 7
+
+    if ratio > 1.10:
+        if ratio <= 1.20:
+            return 9
+        elif ratio <= 1.50:
+            return 8
+        else:
+            return 7
+
+    return 0
+
+
+def _boundary_ratios():
+    ratios = [0.0, -1.0, 1.0, np.nan, np.inf, -np.inf]
+    for t in THRESHOLDS:
+        ratios += [np.nextafter(t, -np.inf), t, np.nextafter(t, np.inf)]
+    return np.array(ratios)
+
+
+def test_vectorized_matches_ladder_at_boundaries():
+    ratios = _boundary_ratios()
+    expected = [_ladder_rom_grade(r) for r in ratios]
+    np.testing.assert_array_equal(score.get_rom_grades(ratios), expected)
+
+
+@pytest.mark.parametrize("ratio", list(_boundary_ratios()))
+def test_scalar_matches_ladder_at_boundaries(ratio):
+    assert score.get_rom_grade(ratio) == _ladder_rom_grade(ratio)
+
+
+def test_inclusive_limits():
+    assert score.get_rom_grade(0.90) == 10
+    assert score.get_rom_grade(1.10) == 10
+    assert score.get_rom_grade(np.nextafter(1.10, np.inf)) == 9
+    assert score.get_rom_grade(1.80) == 7
+    assert score.get_rom_grade(np.nextafter(1.80, np.inf)) == 0
+    assert score.get_rom_grade(0.30) == 7
+    assert score.get_rom_grade(np.nextafter(0.30, -np.inf)) == 0
+
+
+def test_nan_and_inf_grade_zero():
+    np.testing.assert_array_equal(score.get_rom_grades([np.nan, np.inf, -np.inf]), [0, 0, 0])
@@ -46,6 +46,10 @@ COMMAND_PORT = 50238   # Unity → Python
 SCORE_PORT   = 50239   # Python → Unity
 UNITY_LANDMARK_PORT = 50237 # Python → Unity (Live avatar motion)
 
+# Half-width of the depth window searched when a joint pixel is a hole
+# (same as capture.MotionCapture.DEPTH_SEARCH_RADIUS)
+DEPTH_SEARCH_RADIUS = 2
+
 # ── Pose landmark indices ──────────────────────────────────────────────────────
 _POSE_LANDMARKS = {
     "RIGHT_SHOULDER": 12, "RIGHT_ELBOW": 14, "RIGHT_WRIST": 16,
@@ -97,6 +101,7 @@ class UnityBridgeCapture:
         # Camera objects (set up in run())
         self._rs_pipeline = None
         self._rs_align    = None
+        self._depth_scale = 0.001  # z16 units → metres; replaced by the sensor's value
         self._cap         = None
         self._landmarker  = None
 
@@ -121,20 +126,26 @@ class UnityBridgeCapture:
         except Exception as e:
             print(f"[Bridge] UDP send error: {e}")
 
-    def _send_landmarks(self, pose_landmarks, depth_frame, img_w, img_h):
-        """Send real-time 3D pose landmarks to animate the Unity avatar."""
-        landmarks_out = []
-        for idx, lm in enumerate(pose_landmarks):
-            px = int(lm.x * img_w)
-            py = int(lm.y * img_h)
-            x, y, z = float(lm.x), float(lm.y), float(lm.z)
-            if self.camera_source == "realsense" and depth_frame is not None:
-                p3d = self._deproject(depth_frame, px, py)
-                if p3d is not None:
-                    x, y, z = p3d[0], p3d[1], p3d[2]
-            
-            landmarks_out.append({"id": idx, "x": x, "y": y, "z": z, "v": round(float(lm.visibility), 2)})
-            
+    def _pose_xyz(self, pose_landmarks, depth_frame, img_w, img_h) -> np.ndarray:
+        """
+        (N, 3) positions for every pose landmark in one pass per frame.
+
+        Metric RealSense points where depth is available, otherwise the
+        normalized MediaPipe coordinates, as capture.py records them.
+        """
+        lm_xyz = np.array([(lm.x, lm.y, lm.z) for lm in pose_landmarks], dtype=float)
+        if self.camera_source != "realsense" or depth_frame is None:
+            return lm_xyz
+        p3d = self._deproject_batch(depth_frame, lm_xyz[:, 0], lm_xyz[:, 1], img_w, img_h)
+        return np.where(np.isnan(p3d), lm_xyz, p3d)
+
+    def _send_landmarks(self, pose_landmarks, xyz):
+        """Send real-time 3D pose landmarks (positions from `_pose_xyz`) to animate the Unity avatar."""
+        landmarks_out = [
+            {"id": idx, "x": float(x), "y": float(y), "z": float(z), "v": round(float(lm.visibility), 2)}
+            for idx, ((x, y, z), lm) in enumerate(zip(xyz, pose_landmarks))
+        ]
+
         payload = {
             "landmarks": landmarks_out,
             "left_hand": [],
@@ -156,7 +167,8 @@ class UnityBridgeCapture:
                 cfg.enable_stream(rs.stream.depth, 640, 480, rs.format.z16, 30)
                 cfg.enable_stream(rs.stream.color, 640, 480, rs.format.bgr8, 30)
                 self._rs_align = rs.align(rs.stream.color)
-                self._rs_pipeline.start(cfg)
+                profile = self._rs_pipeline.start(cfg)
+                self._depth_scale = profile.get_device().first_depth_sensor().get_depth_scale()
                 print("[Bridge] RealSense D435i connected (headless mode)")
                 return True
             except Exception as e:
@@ -189,19 +201,47 @@ class UnityBridgeCapture:
             ok, img = self._cap.read()
             return (img, None) if ok else (None, None)
 
-    @staticmethod
-    def _deproject(depth_frame, x: int, y: int):
-        if depth_frame is None:
-            return None
-        w = depth_frame.get_width()
-        h = depth_frame.get_height()
-        x = max(0, min(x, w - 1))
-        y = max(0, min(y, h - 1))
-        dist = depth_frame.get_distance(x, y)
-        if dist <= 0:
-            return None
+    def _deproject_batch(self, depth_frame, lm_x, lm_y, img_w: int, img_h: int) -> np.ndarray:
+        """
+        Back-project many normalized landmarks at once.
+
+        Depths are gathered from one depth-image fetch and, for the
+        distortion-free stream the D435i reports after alignment, projected
+        with the pinhole model as array ops. A joint pixel that is a depth
+        hole takes the median of the valid pixels in its
+        (2 * DEPTH_SEARCH_RADIUS + 1)² window, like capture.py's
+        `_deproject_to_metric`. Returns an (N, 3) array in metres with NaN
+        rows where no depth was found.
+        """
+        depth_np = np.asanyarray(depth_frame.get_data())
+        h, w = depth_np.shape
+        px = np.clip((np.asarray(lm_x) * img_w).astype(int), 0, w - 1)
+        py = np.clip((np.asarray(lm_y) * img_h).astype(int), 0, h - 1)
+        raw = depth_np[py, px].astype(float)
+        r = DEPTH_SEARCH_RADIUS
+        for k in np.flatnonzero(raw == 0):
+            y, x = py[k], px[k]
+            win = depth_np[max(0, y - r):y + r + 1, max(0, x - r):x + r + 1]
+            valid = win[win > 0]
+            if valid.size:
+                raw[k] = np.median(valid)
+        z = raw * self._depth_scale
+
         intr = depth_frame.profile.as_video_stream_profile().intrinsics
-        return rs.rs2_deproject_pixel_to_point(intr, [x, y], dist)
+        if any(intr.coeffs):
+            # Distorted model: let the SDK undistort each point
+            out = np.array([
+                rs.rs2_deproject_pixel_to_point(intr, [int(u), int(v)], float(d))
+                for u, v, d in zip(px, py, z)
+            ], dtype=float).reshape(-1, 3)
+        else:
+            out = np.column_stack([
+                (px - intr.ppx) / intr.fx * z,
+                (py - intr.ppy) / intr.fy * z,
+                z,
+            ])
+        out[z <= 0] = np.nan
+        return out
 
     # ── MediaPipe setup ────────────────────────────────────────────────────────
 
@@ -318,7 +358,8 @@ class UnityBridgeCapture:
                 # Draw simple landmarks
                 for lm in result.pose_landmarks[0]:
                     cv2.circle(image, (int(lm.x * w), int(lm.y * h)), 4, (0, 255, 0), -1)
-                self._send_landmarks(result.pose_landmarks[0], depth, w, h)
+                pose_xyz = self._pose_xyz(result.pose_landmarks[0], depth, w, h)
+                self._send_landmarks(result.pose_landmarks[0], pose_xyz)
             else:
                 cv2.putText(image, "NO POSE DETECTED - PLEASE STAND IN FRAME", (20, 80), cv2.FONT_HERSHEY_SIMPLEX, 0.8, (0, 0, 255), 2)
 
@@ -384,24 +425,13 @@ class UnityBridgeCapture:
 
                 # Record data
                 if result and result.pose_landmarks:
-                    lms = result.pose_landmarks[0]
+                    # Same per-frame depth fetch and hole fallback as the avatar stream
                     row = {"timestamp": elapsed}
                     for name, idx in self.joint_indices.items():
-                        lm = lms[idx]
-                        px = int(lm.x * w)
-                        py = int(lm.y * h)
-                        p3d = None
-                        if self.camera_source == "realsense" and depth is not None:
-                            p3d = self._deproject(depth, px, py)
-
-                        if p3d:
-                            row[f"{name}_x"] = p3d[0]
-                            row[f"{name}_y"] = p3d[1]
-                            row[f"{name}_z"] = p3d[2]
-                        else:
-                            row[f"{name}_x"] = float(lm.x)
-                            row[f"{name}_y"] = float(lm.y)
-                            row[f"{name}_z"] = float(lm.z)
+                        x, y, z = pose_xyz[idx].tolist()
+                        row[f"{name}_x"] = x
+                        row[f"{name}_y"] = y
+                        row[f"{name}_z"] = z
 
                     self._motion_data.append(row)
 